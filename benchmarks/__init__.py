@@ -0,0 +1,5 @@
+"""Benchmarks for clout, run with ``tox -e bench`` or ``pytest benchmarks``.
+
+Results are saved under ``.benchmarks/``. To check for regressions against the
+last saved run, pass ``--benchmark-compare --benchmark-compare-fail=mean:10%``.
+"""
@@ -0,0 +1,76 @@
+"""Generate dataclasses, environments and command lines of a given size."""
+import typing as t
+
+import attr
+
+
+def field_names(width: int, level: int, unique: bool) -> t.List[str]:
+    prefix = f"l{level}" if unique else ""
+    return [f"{prefix}{kind}{i}" for i in range(width) for kind in ("text", "number")]
+
+
+def child_name(level: int, unique: bool) -> str:
+    return f"l{level}child" if unique else "child"
+
+
+def make_config(
+    width: int, depth: int, unique: bool = False, name: str = "Config", level: int = 0
+) -> type:
+    """Make a dataclass with ``width`` fields per level, nested ``depth`` levels deep.
+
+    Each level has ``width`` string and int fields and, above the last level,
+    one nested dataclass field called ``child``. Field names repeat on every
+    level, so the command line is ambiguous, unless ``unique`` is set.
+    """
+    fields = {}
+    for field_name in field_names(width, level, unique):
+        if field_name.startswith(("text", f"l{level}text")):
+            fields[field_name] = attr.ib(type=str, default="")
+        else:
+            fields[field_name] = attr.ib(type=int, default=0)
+    if depth > 1:
+        child = make_config(width, depth - 1, unique, f"{name}Child", level + 1)
+        fields[child_name(level, unique)] = attr.ib(type=child, factory=child)
+    return attr.make_class(name, fields, frozen=True)
+
+
+def make_args(width: int, depth: int, unique: bool = False) -> t.List[str]:
+    """Make a command line setting every field of ``make_config(width, depth)``."""
+    args: t.List[str] = []
+    for level in range(depth):
+        if level:
+            args.append(child_name(level - 1, unique))
+        for field_name in field_names(width, level, unique):
+            value = f"text {level}" if "text" in field_name else str(level)
+            args += [f"--{field_name}", value]
+    return args
+
+
+def make_environ(width: int, depth: int, prefix: str) -> t.Dict[str, str]:
+    """Make environment variables setting every field of ``make_config(width, depth)``."""
+    environ = {}
+    for level in range(depth):
+        path = "_".join([prefix] + ["CHILD"] * level)
+        for i in range(width):
+            environ[f"{path}_TEXT{i}"] = f"text {level} {i}"
+            environ[f"{path}_NUMBER{i}"] = str(i)
+    return environ
+
+
+def make_layers(count: int, width: int, depth: int) -> t.List[dict]:
+    """Make ``count`` nested dicts shaped like ``make_config(width, depth)``."""
+
+    def make(layer: int, level: int) -> dict:
+        d: dict = {}
+        for i in range(width):
+            d[f"text{i}"] = f"layer {layer}"
+            d[f"number{i}"] = layer
+        if level + 1 < depth:
+            d["child"] = make(layer, level + 1)
+        return d
+
+    return [make(layer, 0) for layer in range(count)]
+
+
+SIZES = [(2, 2), (5, 3), (10, 4)]
+SIZE_IDS = [f"width{width}-depth{depth}" for width, depth in SIZES]
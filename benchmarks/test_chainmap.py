@@ -0,0 +1,62 @@
+import collections
+import collections.abc
+
+import pytest
+
+import clout._loaders.multi
+
+
+class UncachedDeepChainMap(collections.ChainMap):
+    """The DeepChainMap lookup before nested views were cached, for comparison."""
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if isinstance(value, collections.abc.Mapping):
+            return type(self)(*[m[key] for m in self.maps if key in m])
+        return value
+
+
+def make_layers(count, width, depth):
+    def make(layer, level):
+        if level == depth:
+            return layer
+        return {f"field_{i}": make(layer, level + 1) for i in range(width)}
+
+    return [make(layer, 0) for layer in range(count)]
+
+
+def lookup_all(dcm, width, depth):
+    paths = [()]
+    for _ in range(depth):
+        paths = [path + (f"field_{i}",) for path in paths for i in range(width)]
+    for path in paths:
+        value = dcm
+        for key in path:
+            value = value[key]
+
+
+@pytest.mark.parametrize(
+    "chain_map",
+    [clout._loaders.multi.DeepChainMap, UncachedDeepChainMap],
+    ids=["cached", "uncached"],
+)
+def test_nested_lookups(benchmark, chain_map):
+    benchmark.group = "chainmap-lookups"
+    dcm = chain_map(*make_layers(5, 10, 3))
+
+    benchmark(lookup_all, dcm, 10, 3)
+
+
+@pytest.mark.parametrize(
+    "materialize",
+    [
+        lambda dcm: clout._loaders.multi.DeepChainMap(*dcm.maps).to_dict(),
+        lambda dcm: clout._loaders.multi.DeepChainMap(*dcm.maps).flatten(),
+    ],
+    ids=["to_dict", "flatten"],
+)
+def test_materialize(benchmark, materialize):
+    benchmark.group = "chainmap-materialize"
+    dcm = clout._loaders.multi.DeepChainMap(*make_layers(5, 10, 3))
+
+    benchmark(materialize, dcm)
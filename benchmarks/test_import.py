@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "code",
+    ["import clout", "import clout; clout.Command"],
+    ids=["import", "import-cli"],
+)
+def test_cold_import(benchmark, code):
+    """Start a fresh interpreter and import clout."""
+    benchmark.group = "cold-import"
+
+    benchmark.pedantic(
+        subprocess.run,
+        args=([sys.executable, "-c", code],),
+        kwargs=dict(check=True, capture_output=True),
+        rounds=10,
+    )
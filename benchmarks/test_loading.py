@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import clout._loaders.env
+import clout._loaders.file
+import clout._loaders.multi
+import clout._loaders.schemas
+
+from . import schemas
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_env_prep(benchmark, monkeypatch, width, depth):
+    benchmark.group = "Env.prep"
+    typ = schemas.make_config(width, depth)
+    for name, value in schemas.make_environ(width, depth, "APP").items():
+        monkeypatch.setenv(name, value)
+    env = clout._loaders.env.Env(prefix="APP")
+
+    loaded = benchmark(env.prep, typ)
+
+    assert loaded["text0"] == "text 0 0"
+
+
+@pytest.mark.parametrize("concurrent", [False, True], ids=["sequential", "concurrent"])
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_multi_build(benchmark, monkeypatch, tmp_path, width, depth, concurrent):
+    """Build from a config file and environment variables."""
+    benchmark.group = f"Multi.build-{'concurrent' if concurrent else 'sequential'}"
+    typ = schemas.make_config(width, depth)
+    for name, value in schemas.make_environ(width, depth, "APP").items():
+        monkeypatch.setenv(name, value)
+    path = tmp_path / "config.json"
+    [layer] = schemas.make_layers(1, width, depth)
+    path.write_text(json.dumps(layer))
+    multi = clout._loaders.multi.Multi(
+        [clout._loaders.env.Env(prefix="APP"), clout._loaders.file.File(path)],
+        concurrent=concurrent,
+    )
+
+    built = benchmark(multi.build, typ)
+
+    assert built.text0 == "text 0 0"
+
+
+@pytest.mark.parametrize("specialized", [False, True], ids=["schema", "loader"])
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_load(benchmark, width, depth, specialized):
+    """Build a dataclass from already converted data."""
+    benchmark.group = f"load-{width}x{depth}"
+    typ = schemas.make_config(width, depth)
+    [layer] = schemas.make_layers(1, width, depth)
+    if specialized:
+        load = clout._loaders.schemas.get_loader(typ)
+    else:
+        load = clout._loaders.schemas.get_schema(typ).load
+
+    built = benchmark(load, layer)
+
+    assert built.text0 == "layer 0"
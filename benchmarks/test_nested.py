@@ -0,0 +1,38 @@
+import glom
+import pytest
+
+import clout._loaders.env
+
+
+def make_nested_glom(path_to_value):
+    """The glom-based implementation that make_nested replaced, for comparison."""
+    d = {}
+    for path, value in sorted(
+        path_to_value.items(), key=lambda path_value: len(path_value[0])
+    ):
+        glom.assign(d, ".".join(path), value, missing=dict)
+    return d
+
+
+def make_paths(width, depth):
+    paths = [()]
+    for _ in range(depth):
+        paths = [path + (f"field_{i}",) for path in paths for i in range(width)]
+    return {path: i for i, path in enumerate(paths)}
+
+
+@pytest.mark.parametrize(
+    "width,depth", [(10, 3), (40, 2), (8, 4)], ids=["1000", "1600", "4096"]
+)
+@pytest.mark.parametrize(
+    "make_nested",
+    [clout._loaders.env.make_nested, make_nested_glom],
+    ids=["trie", "glom"],
+)
+def test_make_nested(benchmark, make_nested, width, depth):
+    benchmark.group = f"make_nested-{width ** depth}"
+    paths = make_paths(width, depth)
+
+    nested = benchmark(make_nested, paths)
+
+    assert nested == clout._loaders.env.make_nested(paths)
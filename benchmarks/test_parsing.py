@@ -0,0 +1,108 @@
+import lark
+import pytest
+
+import clout._loaders.cli
+import clout._loaders.parsing
+import clout.exceptions
+
+from . import schemas
+
+
+AMBIGUOUS_SIZES = [(2, 2), (3, 3), (10, 2)]
+AMBIGUOUS_SIZE_IDS = [f"width{width}-depth{depth}" for width, depth in AMBIGUOUS_SIZES]
+
+
+def make_command(width, depth, unique=True):
+    typ = schemas.make_config(width, depth, unique)
+    return clout._loaders.cli.CLI(app_name="config").get_command(typ)
+
+
+def make_argv(width, depth, unique=True):
+    return [clout._loaders.cli.TOP_LEVEL_NAME, "config"] + schemas.make_args(
+        width, depth, unique
+    )
+
+
+def make_parser(width, depth, unique=True):
+    parser = clout._loaders.parsing.Parser(
+        make_command(width, depth, unique), cache=clout._loaders.parsing.ParserCache()
+    )
+    # Build the Earley parser outside of the measurement.
+    parser.cache.get(parser.group)
+    return parser
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_build_grammar(benchmark, width, depth):
+    benchmark.group = "build_grammar"
+    command = make_command(width, depth)
+
+    benchmark(clout._loaders.parsing.build_grammar, command)
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_build_lark_parser(benchmark, width, depth):
+    benchmark.group = "make_lark_parser"
+    grammar = clout._loaders.parsing.build_grammar(make_command(width, depth))
+
+    benchmark(clout._loaders.parsing.make_lark_parser, grammar)
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_parse_unambiguous(benchmark, width, depth):
+    benchmark.group = "parse_args-unambiguous"
+    parser = make_parser(width, depth)
+
+    value = benchmark(parser.parse_args, make_argv(width, depth))
+
+    assert "config" in value
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_parse_earley(benchmark, width, depth):
+    """The same command lines, forced through the Earley parser."""
+    benchmark.group = "parse_args-earley"
+    parser = make_parser(width, depth)
+    args = clout._loaders.parsing.split_option_values(
+        make_argv(width, depth), parser._value_decls
+    )
+
+    value = benchmark(parser.parse_earley, args)
+
+    assert "config" in value
+
+
+@pytest.mark.parametrize("width,depth", AMBIGUOUS_SIZES, ids=AMBIGUOUS_SIZE_IDS)
+def test_parse_ambiguous(benchmark, width, depth):
+    benchmark.group = "parse_args-ambiguous"
+    parser = make_parser(width, depth, unique=False)
+
+    value = benchmark(parser.parse_args, make_argv(width, depth, unique=False))
+
+    assert "config" in value
+
+
+def parse_failing(parser, args, exception):
+    try:
+        parser.parse_args(args)
+    except exception:
+        return
+    raise AssertionError(f"{args} parsed")
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_parse_missing_value(benchmark, width, depth):
+    benchmark.group = "parse_args-missing-value"
+    parser = make_parser(width, depth)
+    args = make_argv(width, depth)[:-1]
+
+    benchmark(parse_failing, parser, args, clout.exceptions.MissingInput)
+
+
+@pytest.mark.parametrize("width,depth", schemas.SIZES, ids=schemas.SIZE_IDS)
+def test_parse_unknown_option(benchmark, width, depth):
+    benchmark.group = "parse_args-unknown-option"
+    parser = make_parser(width, depth)
+    args = make_argv(width, depth) + ["--unknown", "value"]
+
+    benchmark(parse_failing, parser, args, lark.exceptions.LarkError)
@@ -3,7 +3,6 @@ import pathlib
 import appdirs
 import attr
 import click
-import toml
 
 import clout
 
@@ -41,8 +40,7 @@ APP_NAME = "myapp"
 
 
 # Read config file.
-with open("examples/config.toml") as f:
-    CONFIG_FILE_DATA = toml.load(f)
+CONFIG_FILE_DATA = clout.load_file(Config, "examples/config.toml")
 
 
 # Read from environment_variables prefixed `MYAPP_`,
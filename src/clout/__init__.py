@@ -1,8 +1,46 @@
 __version__ = "0.1.14"
 
-__all__ = ["Command", "load_env", "DeepChainMap"]
+__all__ = [
+    "Command",
+    "command",
+    "load_env",
+    "load_file",
+    "DeepChainMap",
+    "RawValue",
+    "parser_cache",
+    "clear_schema_cache",
+    "add_timing_hook",
+    "remove_timing_hook",
+]
 
-from ._loaders.cli import Command
-from ._loaders.cli import command
-from ._loaders.env import load_env
-from ._loaders.multi import DeepChainMap
+import importlib
+
+
+# Attributes are imported on first access, so that ``import clout`` does not pull
+# in click, lark or marshmallow before a command is actually built.
+_LAZY_ATTRIBUTES = {
+    "Command": ("._loaders.command", "Command"),
+    "command": ("._loaders.command", "command"),
+    "load_env": ("._loaders.env", "load_env"),
+    "load_file": ("._loaders.file", "load_file"),
+    "DeepChainMap": ("._loaders.multi", "DeepChainMap"),
+    "RawValue": ("._util", "RawValue"),
+    "parser_cache": ("._loaders.parsing", "PARSER_CACHE"),
+    "clear_schema_cache": ("._loaders.schemas", "clear_schema_cache"),
+    "add_timing_hook": ("._loaders.timing", "add_hook"),
+    "remove_timing_hook": ("._loaders.timing", "remove_hook"),
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name, __name__), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,4 +1,6 @@
-import dataclasses
+import ast
+import collections
+import collections.abc
 import functools
 import os
 import sys
@@ -6,31 +8,32 @@ import typing as t
 
 import attr
 import click
-import desert
-import glom
-import inflection
 import lark
 import marshmallow
-import typing_inspect
 
 import clout.exceptions
 
 from .. import _util
+from . import multi
 from . import parsing
+from . import schemas
+from . import timing
+from .command import EPILOG
+from .command import Command  # noqa: F401
+from .command import Dataclass  # noqa: F401
+from .command import NonStandaloneCommand  # noqa: F401
+from .command import command  # noqa: F401
 
 
 NO_DEFAULT = "__NO_DEFAULT__"
 TOP_LEVEL_NAME = "top_level_name"
 NoneType = type(None)
-Dataclass = t.NewType("Dataclass", type)
 
 
 def is_python_syntax(s: str) -> bool:
-    import black
-
     try:
-        black.format_str(s, 88)
-    except black.InvalidInput:
+        ast.parse(s)
+    except (SyntaxError, ValueError):
         return False
     return True
 
@@ -45,8 +48,6 @@ def pythonify(obj):
 
 class Debug:
     def __repr__(self):
-        import black
-
         pairs = ", ".join(
             (
                 f"{k}={pythonify(v)}"
@@ -55,7 +56,7 @@ class Debug:
             )
         )
         name = type(self).__name__
-        return black.format_str(f"{name}({pairs})", line_length=88)
+        return f"{name}({pairs})"
 
 
 class Option(Debug, click.Option):
@@ -105,8 +106,11 @@ MM_TO_CLICK = {
 }
 
 
+HELP_NAME = "--help"
+
+
 def make_help_command():
-    return DebuggableCommand(name="--help", hidden=True)
+    return DebuggableCommand(name=HELP_NAME, hidden=True)
 
 
 @functools.singledispatch
@@ -172,50 +176,171 @@ def extract(mapping, path):
     return mapping
 
 
-def get_default(field, path, default_map):
+def get_envvar(field: marshmallow.fields.Field) -> t.Optional[str]:
+    return field.metadata.get("clout", {}).get("cli", {}).get("envvar")
+
+
+@attr.dataclass(frozen=True)
+class DefaultIndex:
+    """The leaves of a default map by path, with the name of the layer of each.
+
+    Leaves of unnamed layers have no source.
+    """
+
+    values: t.Dict[t.Tuple[str, ...], t.Any]
+    sources: t.Dict[t.Tuple[str, ...], str]
+    default_map: t.Mapping = attr.ib(factory=dict)
+
+
+def make_default_index(
+    default_map: t.Optional[t.Mapping], names: t.Sequence[str] = ()
+) -> DefaultIndex:
+    """Index ``default_map``, naming its layers (or itself) by ``names``."""
+    if not default_map:
+        return DefaultIndex({}, {})
+    if not isinstance(default_map, multi.DeepChainMap):
+        values = multi.DeepChainMap(default_map).flatten()
+        sources = dict.fromkeys(values, names[0]) if names else {}
+        return DefaultIndex(values, sources, default_map)
+    sources = {
+        path: names[position]
+        for path, position in default_map.sources().items()
+        if position < len(names)
+    }
+    return DefaultIndex(default_map.flatten(), sources, default_map)
+
+
+def find_default(
+    field, path, defaults: DefaultIndex
+) -> t.Optional[t.Tuple[t.Any, t.Optional[str]]]:
+    """Return the default given for ``field`` and where it came from, if any."""
     # XXX The envvar logic should be somewhere else.
-    envvar = field.metadata.get("clout", {}).get("cli", {}).get("envvar")
+    envvar = get_envvar(field)
     if envvar is not None:
         value = os.environ.get(envvar)
         if value is not None:
-            return value
-
+            return value, f"${envvar}"
+
+    key = tuple(path[1:])
+    if key in defaults.values:
+        value = defaults.values[key]
+        if isinstance(value, _util.RawValue):
+            return value.value, value.source
+        return value, defaults.sources.get(key)
+    # Values that are mappings, for example of Mapping or Raw fields, are not
+    # leaves of the index.
     try:
-        value = extract(default_map, path[1:])
-        return value
-    except KeyError:
-        return field.default
+        return extract(defaults.default_map, key), None
+    except (KeyError, TypeError):
+        return None
+
+
+def show_default_source(param: click.Parameter, source: t.Optional[str]) -> None:
+    if source is not None and getattr(param, "show_default", None) is True:
+        param.show_default = f"{param.default} from {source}"
+
+
+def get_envvars(schema: marshmallow.Schema) -> t.Iterator[str]:
+    for field in schema.fields.values():
+        if isinstance(field, marshmallow.fields.Nested):
+            yield from get_envvars(field.schema)
+        elif get_envvar(field) is not None:
+            yield get_envvar(field)
+
+
+def freeze(obj) -> t.Hashable:
+    """Return a hashable snapshot of ``obj``. Raise TypeError if there is none."""
+    if isinstance(obj, collections.abc.Mapping):
+        return frozenset((key, freeze(value)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(value) for value in obj)
+    hash(obj)
+    return obj
+
+
+def get_app_name(command: Group) -> str:
+    """Return the name of the command :func:`wrap_command` wrapped."""
+    [name] = [name for name in command.commands if name != HELP_NAME]
+    return name
+
+
+def wrap_command(command: click.BaseCommand) -> Group:
+    return Group(
+        name=TOP_LEVEL_NAME,
+        commands={c.name: c for c in [command, make_help_command()]},
+        callback=command.callback,
+    )
+
+
+@attr.dataclass(frozen=True)
+class CommandPlan:
+    """A command tree built for a dataclass, with the environment it depends on.
+
+    ``parsers`` keeps the parser of the tree for each value of ``raw``, so its
+    memo of parsed command lines outlives a single batch.
+    """
+
+    command: click.BaseCommand
+    envvars: t.Dict[str, t.Optional[str]]
+    parsers: t.Dict[bool, parsing.Parser] = attr.ib(factory=dict, eq=False)
+
+    def is_current(self) -> bool:
+        return all(os.environ.get(k) == v for k, v in self.envvars.items())
+
+
+COMMAND_PLANS: t.MutableMapping[t.Hashable, CommandPlan] = collections.OrderedDict()
+MAX_COMMAND_PLANS = 64
+
+
+@schemas.on_clear
+def clear_command_plans(cls: t.Optional[type]) -> None:
+    for key in list(COMMAND_PLANS):
+        if cls is None or key[0] is cls:
+            parsing.forget_transformers(COMMAND_PLANS.pop(key).command)
 
 
 @attr.dataclass(frozen=True)
 class CLI:
     context_settings: t.Dict[str, t.Any] = attr.ib(factory=dict)
-    inherits: t.FrozenSet[str] = frozenset({"app_name"})
+    inherits: t.FrozenSet[str] = frozenset({"app_name", "raw"})
     metadata_key: str = "cli"
-    args: t.List[str] = attr.ib(factory=list)
+    # The arguments after the command name; sys.argv[2:] unless given, even empty.
+    args: t.Optional[t.List[str]] = None
     app_name: t.Optional[str] = None
+    raw: bool = False
+    # Opt in to naming where each default comes from in the help, for example
+    # "[default: 5432 from config.toml]". ``default_sources`` names the layers
+    # of the default map; environment variables and raw values name themselves.
+    show_default_sources: bool = False
+    default_sources: t.Sequence[str] = ()
 
     def make_command_from_schema(
-        self, schema: marshmallow.Schema, path: t.Sequence[str]
+        self,
+        schema: marshmallow.Schema,
+        path: t.Sequence[str],
+        defaults: t.Optional[DefaultIndex] = None,
     ) -> click.BaseCommand:
         params = []
         commands = []
+        if defaults is None:
+            defaults = make_default_index(
+                self.context_settings.get("default_map"), self.default_sources
+            )
 
         for field in schema.fields.values():
 
             if isinstance(field, marshmallow.fields.Nested):
                 commands.append(
                     self.make_command_from_schema(
-                        field.schema, path=path + (field.name,)
+                        field.schema, path=path + (field.name,), defaults=defaults
                     )
                 )
             elif isinstance(field, marshmallow.fields.Field):
                 user_specified = field.metadata.get("cli")
-                default = get_default(
-                    field,
-                    path=path + (field.name,),
-                    default_map=self.context_settings.get("default_map", {}),
+                found = find_default(
+                    field, path=path + (field.name,), defaults=defaults
                 )
+                default, source = found or (field.default, None)
 
                 if isinstance(field.metadata.get("cli"), click.Parameter):
                     param = field.metadata["cli"]
@@ -225,6 +350,12 @@ class CLI:
                     param = make_param_from_field(
                         field, user_specified, default=default
                     )
+                    if self.show_default_sources:
+                        show_default_source(param, source)
+                    if self.raw and found is not None:
+                        param.raw_default = _util.RawValue(
+                            default, source or "default_map"
+                        )
 
                 params.append(param)
             else:
@@ -260,35 +391,77 @@ class CLI:
         metadata: t.Mapping[str, t.Any] = None,
         args=(),
     ):
+        return self.get_plan(typ, metadata).command
+
+    def get_plan(
+        self, typ: t.Type, metadata: t.Mapping[str, t.Any] = None
+    ) -> CommandPlan:
+        """Return the command plan for ``typ``, reusing a current cached one."""
         metadata = metadata or {}
 
         cli_metadata: t.Union[
             t.Dict[str, t.Any], click.BaseCommand, click.Parameter
         ] = metadata.get(self.metadata_key, None)
         if isinstance(cli_metadata, (click.BaseCommand, click.Parameter)):
-            command = cli_metadata
-        else:
-
-            name = metadata.get("name", _util.dasherize(self.app_name))
+            return CommandPlan(wrap_command(cli_metadata), {})
 
-            schema = desert.schema_class(typ)()
+        name = metadata.get("name", _util.dasherize(self.app_name))
+        try:
+            key = (
+                typ,
+                name,
+                freeze(self.context_settings),
+                self.show_default_sources,
+                tuple(self.default_sources),
+                self.raw,
+            )
+        except TypeError:
+            key = None
+        plan = COMMAND_PLANS.get(key)
+        if plan is not None and plan.is_current():
+            return plan
+
+        with timing.phase("schema"):
+            schema = schemas.get_schema(typ)
+        envvars = {envvar: os.environ.get(envvar) for envvar in get_envvars(schema)}
+        with timing.phase("command_tree"):
             command = self.make_command_from_schema(schema, path=(name,))
 
-            def schema_load(*a, **kw):
-                try:
-                    return schema.load(*a, **kw)
-                except marshmallow.exceptions.ValidationError as e:
-                    raise clout.exceptions.ValidationError(*e.args) from e
-
-            command.callback = schema_load
-
-        command = Group(
-            name=TOP_LEVEL_NAME,
-            commands={c.name: c for c in [command, make_help_command()]},
+        load = schemas.get_loader(typ)
+
+        def schema_load(data):
+            try:
+                return load(data)
+            except marshmallow.exceptions.ValidationError as e:
+                raise clout.exceptions.ValidationError(*e.args) from e
+
+        command.callback = schema_load
+        plan = CommandPlan(wrap_command(command), envvars)
+
+        if key is not None:
+            COMMAND_PLANS[key] = plan
+            while len(COMMAND_PLANS) > MAX_COMMAND_PLANS:
+                COMMAND_PLANS.popitem(last=False)
+        return plan
+
+    def get_parser(self, plan: CommandPlan) -> parsing.Parser:
+        parser = plan.parsers.get(self.raw)
+        if parser is None:
+            parser = plan.parsers[self.raw] = self.make_parser(plan.command)
+        return parser
+
+    def make_parser(self, command: click.BaseCommand) -> parsing.Parser:
+        # In raw mode the command line only gives the values it was passed and
+        # the defaults it was given, so the loaders after it in a Multi give the
+        # defaults of the fields.
+        return parsing.Parser(
+            command,
             callback=command.callback,
+            use_defaults=not self.raw,
+            raw=self.raw,
         )
-        return command
 
+    @timing.recorded
     def prep(
         self,
         typ: t.Type,
@@ -297,12 +470,13 @@ class CLI:
         args=(),
     ):
 
-        command = self.get_command(typ, default, metadata, args)
+        plan = self.get_plan(typ, metadata)
+        command = plan.command
 
-        parser = parsing.Parser(command, callback=command.callback, use_defaults=True)
-        cli_args = (TOP_LEVEL_NAME, _util.dasherize(typ.__name__)) + tuple(
-            args or self.args or sys.argv[2:]
-        )
+        parser = self.get_parser(plan)
+        if not args:
+            args = sys.argv[2:] if self.args is None else self.args
+        cli_args = (TOP_LEVEL_NAME, get_app_name(command)) + tuple(args)
 
         try:
             result = parser.parse_args(cli_args)
@@ -327,6 +501,7 @@ class CLI:
 
         return value
 
+    @timing.recorded
     def build(
         self,
         typ: t.Type,
@@ -337,85 +512,44 @@ class CLI:
 
         command = self.get_command(typ, default, metadata, args)
 
-        result = command.callback(self.prep(typ, default, metadata, args))
+        prepped = self.prep(typ, default, metadata, args)
+        with timing.phase("schema_load"):
+            result = command.callback(prepped)
 
         return result
 
-    def set(self, **kw):
-        return attr.evolve(self, **kw)
-
-
-class NonStandaloneCommand(click.Command):
-    def main(self, *a, standalone_mode=False, **kw):
-        return super().main(*a, standalone_mode=standalone_mode, **kw)
-
-
-EPILOG = "\n\nNote:\n  export CLI_SHOW_TRACEBACK=1 to show traceback on error.\n"
-
-
-class Command(click.Command):
-    """A :class:`click.Command` built from an :func:`attr.dataclass` or :func:`dataclasses.dataclass`."""
-
-    def __init__(
+    def build_many(
         self,
-        type,
-        *args,
-        name=None,
-        app_name=None,
-        callback=lambda x: x,
-        params=None,
-        context_settings=None,
-        epilog=None,
-        **kwargs,
-    ):
-        if not (attr.has(type) or dataclasses.is_dataclass(type)):
-            raise TypeError(f"Need a dataclass, got {type} of type {type.__class__}")
-        self.app_name = app_name
-
-        epilog = epilog or ""
-        epilog += EPILOG
-
-        context_settings = context_settings or {}
-        context_settings["ignore_unknown_options"] = True
-        super().__init__(
-            name=name,
-            *args,
-            **kwargs,
-            add_help_option=False,
-            epilog=epilog,
-            context_settings=context_settings,
-        )
-        self.params = (params or []) + [
-            click.Argument(["args"], type=click.UNPROCESSED, nargs=-1)
-        ]
-        self.callback = lambda args: callback(
-            CLI(
-                app_name=app_name or _util.dasherize(type.__name__),
-                context_settings=context_settings,
-            ).build(type, args=args)
-        )
-
-    def build(self):
-        """Return an instance of `self.type`, built from the command line arguments."""
-        return self.main(standalone_mode=False)
-
-    def main(self, **kwargs):
-        """Run the command and exit the program afterwards.
+        typ: t.Type,
+        argvs: t.Iterable[t.Sequence[str]],
+        processes: t.Optional[int] = None,
+    ) -> t.List[parsing.ParseResult]:
+        """Build ``typ`` from each of ``argvs``, in order, without exiting on errors.
 
-        Upcalls directly to :meth:`click.MultiCommand.main()`.
+        Each result has either the built ``value`` or an ``error``. See
+        :meth:`parsing.Parser.parse_many` for ``processes``.
         """
-        return super().main(**kwargs)
-
-
-def command(type: Dataclass, **kwargs):
-    """A decorator that replaces the decorated function with a :class:`clout.Command`.
-
-    The with `callback` attribute is set to the decorated function. Compare to
-    :func:`click.command()`.
-
-    """
+        argvs = [tuple(args) for args in argvs]
+        plan = self.get_plan(typ)
+        command = plan.command
+        parser = self.get_parser(plan)
+        prefix = (TOP_LEVEL_NAME, get_app_name(command))
+        parsed = parser.parse_many(
+            [prefix + args for args in argvs], processes=processes
+        )
 
-    def decorator(callback):
-        return Command(type, callback=callback, **kwargs)
+        results = []
+        for args, result in zip(argvs, parsed):
+            result = attr.evolve(result, args=args)
+            if result.ok:
+                [value] = result.value.values()
+                try:
+                    result = attr.evolve(result, value=command.callback(value))
+                except clout.exceptions.ValidationError as e:
+                    error = parsing.ParseFailure.from_exception(e)
+                    result = attr.evolve(result, value=None, error=error)
+            results.append(result)
+        return results
 
-    return decorator
+    def set(self, **kw):
+        return attr.evolve(self, **kw)
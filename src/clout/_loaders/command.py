@@ -0,0 +1,121 @@
+"""The click command built from a dataclass.
+
+This module only imports click and attr, so that a program defining a
+:class:`Command` can answer shell completion without importing the parser and
+schema machinery in :mod:`clout._loaders.cli`.
+"""
+import dataclasses
+import os
+import sys
+import typing as t
+
+import attr
+import click
+
+from .. import _util
+from . import completion
+
+
+Dataclass = t.NewType("Dataclass", type)
+
+
+class NonStandaloneCommand(click.Command):
+    def main(self, *a, standalone_mode=False, **kw):
+        return super().main(*a, standalone_mode=standalone_mode, **kw)
+
+
+EPILOG = "\n\nNote:\n  export CLI_SHOW_TRACEBACK=1 to show traceback on error.\n"
+
+
+class Command(click.Command):
+    """A :class:`click.Command` built from an :func:`attr.dataclass` or :func:`dataclasses.dataclass`."""
+
+    def __init__(
+        self,
+        type,
+        *args,
+        name=None,
+        app_name=None,
+        callback=lambda x: x,
+        params=None,
+        context_settings=None,
+        epilog=None,
+        **kwargs,
+    ):
+        if not (attr.has(type) or dataclasses.is_dataclass(type)):
+            raise TypeError(f"Need a dataclass, got {type} of type {type.__class__}")
+        self.type = type
+        self.app_name = app_name
+
+        epilog = epilog or ""
+        epilog += EPILOG
+
+        context_settings = context_settings or {}
+        context_settings["ignore_unknown_options"] = True
+        super().__init__(
+            name=name,
+            *args,
+            **kwargs,
+            add_help_option=False,
+            epilog=epilog,
+            context_settings=context_settings,
+        )
+        self.params = (params or []) + [
+            click.Argument(["args"], type=click.UNPROCESSED, nargs=-1)
+        ]
+        self.callback = lambda args: callback(self.make_cli().build(type, args=args))
+
+    def make_cli(self):
+        from .cli import CLI
+
+        return CLI(
+            app_name=self.app_name or _util.dasherize(self.type.__name__),
+            context_settings=self.context_settings,
+        )
+
+    def build(self):
+        """Return an instance of `self.type`, built from the command line arguments."""
+        return self.main(standalone_mode=False)
+
+    def main(self, args=None, prog_name=None, complete_var=None, **kwargs):
+        """Run the command and exit the program afterwards.
+
+        Upcalls directly to :meth:`click.MultiCommand.main()`, except for shell
+        completion requests, which are answered from a saved table.
+        """
+        if prog_name is None:
+            prog_name = os.path.basename(sys.argv[0] if sys.argv else __file__)
+        if complete_var is None:
+            complete_var = f"_{prog_name.replace('-', '_').upper()}_COMPLETE"
+        instruction, _, shell = os.environ.get(complete_var, "").partition("_")
+        if instruction == "complete":
+            self.complete(prog_name, shell or "bash")
+            # Exit like click does after completing.
+            sys.exit(1)
+        return super().main(
+            args=args, prog_name=prog_name, complete_var=complete_var, **kwargs
+        )
+
+    def complete(self, prog_name: str, shell: str) -> None:
+        """Print the completions for the command line in ``$COMP_WORDS``."""
+        args, incomplete = completion.get_args(shell)
+        table = completion.get_table(self.type, prog_name, self.make_app_command)
+        completion.respond(completion.complete(table, args, incomplete), shell)
+
+    def make_app_command(self) -> click.BaseCommand:
+        cli = self.make_cli()
+        return cli.get_command(self.type).commands[_util.dasherize(cli.app_name)]
+
+
+def command(type: Dataclass, **kwargs):
+    """A decorator that replaces the decorated function with a :class:`clout.Command`.
+
+    The with `callback` attribute is set to the decorated function. Compare to
+    :func:`click.command()`.
+
+    """
+
+    def decorator(callback):
+        return Command(type, callback=callback, **kwargs)
+
+    return decorator
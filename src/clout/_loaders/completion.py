@@ -0,0 +1,203 @@
+"""Shell completion from a precomputed table of commands and options.
+
+Each TAB press starts a new process, so completion must not build the command
+tree or the grammar. The first completion for a dataclass builds a table of the
+options and subcommands of every command path and saves it as JSON in the
+cache directory. Later completions only read that file. The table is rebuilt
+when a file defining one of the dataclasses changes.
+
+This module imports neither click nor lark.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import shlex
+import sys
+import typing as t
+
+import attr
+
+from .. import _util
+
+
+TABLE_FORMAT = "1"
+
+# {"root": path, "commands": {path: {"options": {decl: [takes_value, help]},
+#                                    "subcommands": {name: [path, help]}}}}
+Table = t.Dict[str, t.Any]
+Choice = t.Tuple[str, str]
+
+
+def make_table(command) -> Table:
+    """Build the completion table of a click command tree."""
+    commands = {}
+
+    def add(cmd, path: str) -> None:
+        options = {}
+        for param in cmd.params:
+            if param.param_type_name != "option" or param.hidden:
+                continue
+            for decl in param.opts:
+                options[decl] = [not param.is_flag, param.help or ""]
+        subcommands = {}
+        for name, sub in getattr(cmd, "commands", {}).items():
+            if sub.hidden:
+                continue
+            sub_path = f"{path} {name}"
+            subcommands[name] = [sub_path, sub.get_short_help_str()]
+            add(sub, sub_path)
+        commands[path] = {"options": options, "subcommands": subcommands}
+
+    add(command, command.name)
+    return {"root": command.name, "commands": commands}
+
+
+def complete(table: Table, args: t.Sequence[str], incomplete: str) -> t.List[Choice]:
+    """Return the options and subcommands that may follow ``args``."""
+    commands = table["commands"]
+    stack = [table["root"]]
+    takes_value = False
+    for arg in args:
+        if takes_value:
+            takes_value = False
+            continue
+        decl = arg.partition("=")[0]
+        # Chained commands accept the options and subcommands of their parents,
+        # but the innermost command wins.
+        for depth in reversed(range(len(stack))):
+            entry = commands[stack[depth]]
+            if decl in entry["options"]:
+                del stack[depth + 1 :]
+                takes_value = entry["options"][decl][0] and "=" not in arg
+                break
+            if arg in entry["subcommands"]:
+                del stack[depth + 1 :]
+                stack.append(entry["subcommands"][arg][0])
+                break
+    if takes_value:
+        return []
+
+    choices: t.Dict[str, str] = {}
+    for path in reversed(stack):
+        entry = commands[path]
+        for name, (_path, help) in entry["subcommands"].items():
+            choices.setdefault(name, help)
+        for decl, (_takes_value, help) in entry["options"].items():
+            choices.setdefault(decl, help)
+    return [
+        (name, help) for name, help in choices.items() if name.startswith(incomplete)
+    ]
+
+
+def source_files(typ: t.Type) -> t.Set[str]:
+    """Return the files defining ``typ`` and the dataclasses nested in it."""
+    files = set()
+    seen = set()
+    todo = [typ]
+    while todo:
+        cls = todo.pop()
+        if cls in seen:
+            continue
+        seen.add(cls)
+        path = getattr(sys.modules.get(cls.__module__), "__file__", None)
+        if path:
+            files.add(os.path.abspath(path))
+        if attr.has(cls):
+            types = [field.type for field in attr.fields(cls)]
+        else:
+            types = [field.type for field in dataclasses.fields(cls)]
+        todo += [
+            field_type
+            for field_type in types
+            if isinstance(field_type, type)
+            and (attr.has(field_type) or dataclasses.is_dataclass(field_type))
+        ]
+    return files
+
+
+def mtimes(files: t.Iterable[str]) -> t.Dict[str, t.Optional[int]]:
+    result = {}
+    for path in files:
+        try:
+            result[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            result[path] = None
+    return result
+
+
+def table_path(typ: t.Type, prog_name: str) -> t.Optional[str]:
+    directory = _util.default_cache_dir()
+    if directory is None:
+        return None
+    from .. import __version__
+
+    key = "\0".join(
+        [TABLE_FORMAT, __version__, typ.__module__, typ.__qualname__, prog_name]
+    )
+    digest = hashlib.sha256(key.encode()).hexdigest()[:32]
+    return os.path.join(directory, f"completion-{digest}.json")
+
+
+def load_table(path: str) -> t.Optional[Table]:
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if mtimes(saved["files"]) != saved["files"]:
+        return None
+    return saved["table"]
+
+
+def save_table(path: str, table: Table, files: t.Iterable[str]) -> None:
+    directory = os.path.dirname(path)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temporary, "w") as f:
+            json.dump({"files": mtimes(files), "table": table}, f)
+        os.replace(temporary, path)
+    except OSError:
+        pass
+
+
+def get_table(typ: t.Type, prog_name: str, build: t.Callable[[], t.Any]) -> Table:
+    """Return the saved table for ``typ``, or make it from the command ``build()``."""
+    path = table_path(typ, prog_name)
+    if path is not None:
+        table = load_table(path)
+        if table is not None:
+            return table
+    table = make_table(build())
+    if path is not None:
+        save_table(path, table, source_files(typ))
+    return table
+
+
+def respond(choices: t.Sequence[Choice], shell: str) -> None:
+    """Print ``choices`` the way click's completion scripts for ``shell`` expect."""
+    lines = []
+    for name, help in choices:
+        if shell == "zsh":
+            lines += [name, help or "_"]
+        elif shell == "fish" and help:
+            lines.append(f"{name}\t{help}")
+        else:
+            lines.append(name)
+    sys.stdout.write("".join(f"{line}\n" for line in lines))
+    sys.stdout.flush()
+
+
+def get_args(shell: str) -> t.Tuple[t.List[str], str]:
+    """Return the words before the cursor and the word being completed."""
+    try:
+        words = shlex.split(os.environ["COMP_WORDS"])
+    except ValueError:
+        words = os.environ["COMP_WORDS"].split()
+    if shell == "fish":
+        incomplete = os.environ.get("COMP_CWORD", "")
+        return words[1:], incomplete
+    cword = int(os.environ["COMP_CWORD"])
+    incomplete = words[cword] if cword < len(words) else ""
+    return words[1:cword], incomplete
@@ -0,0 +1,169 @@
+"""Build dataclasses from loaded data without going through ``Schema.load``.
+
+:func:`make_loader` generates one function per dataclass. The function takes
+values that already have their field's type as they are, builds nested
+dataclasses directly, and hands any other value to its field's
+``deserialize``. It raises the same :class:`marshmallow.ValidationError` as
+``schema.load`` would. :class:`~clout._util.RawValue` leaves are unwrapped and
+converted here, so a raw value is only converted if it is the one loaded.
+Schemas the function cannot reproduce, for example ones with extra hooks or
+that do not raise on unknown fields, are loaded by ``schema.load``.
+"""
+import collections.abc
+import dataclasses
+import math
+import typing as t
+
+import attr
+import marshmallow
+
+from .. import _util
+
+
+Loader = t.Callable[[t.Mapping[str, t.Any]], t.Any]
+
+# The hooks of the schemas desert generates: build the class after loading.
+DESERT_HOOKS = {("post_load", False): ["make_data_class"]}
+
+
+def field_types(cls: t.Type) -> t.Dict[str, t.Any]:
+    if attr.has(cls):
+        return {field.name: field.type for field in attr.fields(cls)}
+    return {field.name: field.type for field in dataclasses.fields(cls)}
+
+
+def is_dataclass(cls) -> bool:
+    return isinstance(cls, type) and (attr.has(cls) or dataclasses.is_dataclass(cls))
+
+
+def is_specializable(schema: marshmallow.Schema) -> bool:
+    return (
+        dict(schema._hooks) == DESERT_HOOKS  # pylint: disable=protected-access
+        and not schema.many
+        and schema.unknown == marshmallow.RAISE
+        and all("." not in (field.attribute or "") for field in schema.fields.values())
+    )
+
+
+def exact_type_check(field: marshmallow.fields.Field) -> t.Optional[str]:
+    """Return a check for values ``field`` would deserialize to themselves."""
+    if field.validators:
+        return None
+    if isinstance(field, marshmallow.fields.Boolean):
+        if field.truthy and (True not in field.truthy or False not in field.falsy):
+            return None
+        return "value is True or value is False"
+    if isinstance(field, marshmallow.fields.Float):
+        if field.allow_nan:
+            return "type(value) is float"
+        return "type(value) is float and isfinite(value)"
+    if isinstance(field, marshmallow.fields.Integer):
+        return "type(value) is int"
+    if isinstance(field, marshmallow.fields.String):
+        return "type(value) is str"
+    if type(field) is marshmallow.fields.Raw:  # pylint: disable=unidiomatic-typecheck
+        return "value is not None"
+    return None
+
+
+def make_loader(cls: t.Type, schema: marshmallow.Schema) -> Loader:
+    """Return a function loading a mapping into ``cls`` like ``schema.load``."""
+    if not is_specializable(schema):
+        return lambda data: schema.load(_util.unwrap(data))
+
+    namespace: t.Dict[str, t.Any] = {
+        "Mapping": collections.abc.Mapping,
+        "ValidationError": marshmallow.ValidationError,
+        "isfinite": math.isfinite,
+        "missing": marshmallow.missing,
+        "RawValue": _util.RawValue,
+        "cls": cls,
+        "schema": schema,
+    }
+    types = field_types(cls)
+    lines = [
+        "def load(data):",
+        "    if not isinstance(data, Mapping):",
+        "        return schema.load(data)",
+        "    errors = {}",
+        "    kwargs = {}",
+    ]
+    keys = set()
+    for position, (name, field) in enumerate(schema.load_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        keys.add(key)
+        namespace[f"field_{position}"] = field
+        lines += [
+            f"    value = data.get({key!r}, missing)",
+            "    if type(value) is RawValue:",
+            "        value = value.value",
+            "    if value is missing:",
+        ]
+        if field.required:
+            message = field.error_messages["required"]
+            lines.append(f"        errors[{key!r}] = [{message!r}]")
+        elif field.missing is marshmallow.missing:
+            lines.append("        pass")
+        else:
+            namespace[f"default_{position}"] = field.missing
+            default = f"default_{position}"
+            if callable(field.missing):
+                lines += [
+                    f"        value = {default}()",
+                    "        if value is not missing:",
+                    f"            kwargs[{attribute!r}] = value",
+                ]
+            else:
+                lines.append(f"        kwargs[{attribute!r}] = {default}")
+
+        child = types.get(attribute)
+        if (
+            isinstance(field, marshmallow.fields.Nested)
+            and not field.many
+            and not field.validators
+            and not field.only
+            and not field.exclude
+            and is_dataclass(child)
+        ):
+            namespace[f"load_{position}"] = make_loader(child, field.schema)
+            lines += [
+                "    elif isinstance(value, Mapping):",
+                "        try:",
+                f"            kwargs[{attribute!r}] = load_{position}(value)",
+                "        except ValidationError as e:",
+                f"            errors[{key!r}] = e.messages",
+            ]
+        else:
+            check = exact_type_check(field)
+            if check is not None:
+                lines += [
+                    f"    elif {check}:",
+                    f"        kwargs[{attribute!r}] = value",
+                ]
+        lines += [
+            "    else:",
+            "        try:",
+            f"            value = field_{position}.deserialize(value, {key!r}, data)",
+            "        except ValidationError as e:",
+            f"            errors[{key!r}] = e.messages",
+            "        else:",
+            "            if value is not missing:",
+            f"                kwargs[{attribute!r}] = value",
+        ]
+
+    namespace["keys"] = frozenset(keys)
+    message = schema.error_messages["unknown"]
+    lines += [
+        "    for key in set(data) - keys:",
+        f"        errors[key] = [{message!r}]",
+        "    if errors:",
+        "        raise ValidationError(errors, data=data, valid_data=kwargs)",
+        "    return cls(**kwargs)",
+    ]
+    source = "\n".join(lines)
+    filename = f"<clout loader for {cls.__module__}.{cls.__qualname__}>"
+    exec(compile(source, filename, "exec"), namespace)  # pylint: disable=exec-used
+    load = namespace["load"]
+    load.source = source
+    return load
@@ -1,22 +1,68 @@
+import collections
+import collections.abc
 import os
 import typing as t
 
 import attr
-import desert
-import glom
 import inflection
 import marshmallow
 
 from .. import _util
+from . import schemas
+
+
+class EnvIndex(t.NamedTuple):
+    """The environment variables a dataclass reads, mapped to field paths."""
+
+    schema: marshmallow.Schema
+    # Shared by every name in ``fields``, to skip unrelated variables quickly.
+    prefix: str
+    fields: t.Dict[str, t.Tuple[t.Tuple[str, ...], marshmallow.fields.Field]]
+
+
+_INDEXES: t.MutableMapping[t.Tuple[type, str], EnvIndex] = collections.OrderedDict()
+MAX_INDEXES = 64
+
+
+@schemas.on_clear
+def clear_indexes(cls: t.Optional[type]) -> None:
+    for key in list(_INDEXES):
+        if cls is None or key[0] is cls:
+            del _INDEXES[key]
+
+
+def scan_environ(
+    environ: t.Mapping[str, str], indexes: t.Sequence[EnvIndex], raw: bool = False
+) -> t.List[t.Dict[t.Tuple[str, ...], t.Any]]:
+    """Collect the values of every index in one pass over ``environ``.
+
+    With ``raw``, values are :class:`~clout._util.RawValue` strings instead of
+    being deserialized.
+    """
+    results: t.List[t.Dict[t.Tuple[str, ...], t.Any]] = [{} for _ in indexes]
+    prefixes = tuple({index.prefix for index in indexes})
+    for name, value in environ.items():
+        if not name.startswith(prefixes):
+            continue
+        for result, index in zip(results, indexes):
+            entry = index.fields.get(name)
+            if entry is not None:
+                path, field = entry
+                if raw:
+                    result[path] = _util.RawValue(value, f"${name}")
+                else:
+                    result[path] = field.deserialize(value)
+    return results
 
 
 @attr.dataclass
 class Env:
     app_name: str = None
     metadata_key: str = "env"
-    inherits: t.List[str] = frozenset({"app_name"})
+    inherits: t.List[str] = frozenset({"app_name", "raw"})
     env: t.Dict[str, t.Any] = attr.ib(factory=dict)
     prefix: str = ""
+    raw: bool = False
 
     def make_path_to_field(
         self, schema: marshmallow.Schema, path=()
@@ -42,42 +88,63 @@ class Env:
         prefix = self.prefix if self.prefix else self.app_name
         return inflection.underscore("_".join((prefix,) + path)).upper()
 
+    def get_index(self, typ) -> EnvIndex:
+        """Return the index of ``typ``'s environment variables for this prefix."""
+        schema = schemas.get_schema(typ)
+        key = (typ, self.prefix if self.prefix else self.app_name)
+        index = _INDEXES.get(key)
+        if index is None or index.schema is not schema:
+            fields = {
+                self.make_envvar_name(path): (path, field)
+                for path, field in self.make_path_to_field(schema, path=()).items()
+            }
+            prefix = os.path.commonprefix(list(fields)) if fields else ""
+            index = _INDEXES[key] = EnvIndex(schema, prefix, fields)
+            while len(_INDEXES) > MAX_INDEXES:
+                _INDEXES.popitem(last=False)
+        else:
+            _INDEXES.move_to_end(key)
+        return index
+
     def prep(self, typ, metadata=None, default=None, env=None, name=None):
         # TODO make sure this handles lists correctly.
         # If a field is a list, this should return a list, not a single member.
-        metadata = metadata or {}
-
-        schema = desert.schema_class(typ)()
-
-        path_to_field = self.make_path_to_field(schema, path=())
-
-        d = {}
-        for path, field in path_to_field.items():
-            name = self.make_envvar_name(path)
-
-            value = os.environ.get(name)
+        [nested] = self.prep_many([typ], env=env)
+        return nested
+
+    def prep_many(
+        self, types: t.Sequence[type], env: t.Optional[t.Mapping[str, str]] = None
+    ) -> t.List[dict]:
+        """Load several dataclasses with a single scan of the environment."""
+        environ = os.environ if env is None else env
+        indexes = [self.get_index(typ) for typ in types]
+        found = scan_environ(environ, indexes, raw=self.raw)
+        return [make_nested(d) for d in found]
 
-            if value is not None:
-                d[path] = field.deserialize(value)
+    def set(self, **kw):
+        return attr.evolve(self, **kw)
 
-        nested = make_nested(d)
 
-        try:
-            return nested
-        except KeyError:
-            return {}
+Path = t.Tuple[str, ...]
 
-    def set(self, **kw):
-        return attr.evolve(self, **kw)
 
+def make_nested(
+    path_to_value: t.Union[t.Mapping[Path, t.Any], t.Iterable[t.Tuple[Path, t.Any]]]
+) -> dict:
+    """Build nested dicts from ``(path, value)`` pairs, in any order.
 
-def make_nested(path_to_value: t.Dict[t.Tuple, t.Any]) -> dict:
-    d = {}
-    for path, value in sorted(
-        path_to_value.items(), key=lambda path_value: len(path_value[0])
-    ):
-        func = dict
-        glom.assign(d, ".".join(path), value, missing=func)
+    Paths are tuples of keys, so keys may contain dots. Pairs may be given as a
+    mapping or streamed from any iterable.
+    """
+    if isinstance(path_to_value, collections.abc.Mapping):
+        path_to_value = path_to_value.items()
+    d: dict = {}
+    for path, value in path_to_value:
+        *parents, leaf = path
+        node = d
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = value
     return d
 
 
@@ -0,0 +1,123 @@
+"""Table-driven parsing of command lines with a single interpretation.
+
+The Earley parser in :mod:`clout._loaders.parsing` handles every command line the
+grammar allows, including ambiguous ones. Most command lines are a plain sequence
+of ``--opt value`` pairs and subcommand names, where each argument can only mean
+one thing. This module parses those in one pass over the arguments, and gives up
+(returns ``None``) whenever an argument could be read in more than one way, so the
+caller can fall back to the Earley parser.
+
+The table only holds rule names and strings, so it can be built once from a
+command tree and reused without the tree.
+"""
+import collections
+import typing as t
+
+
+class Param(t.NamedTuple):
+    rule: str
+    takes_value: bool
+    limit: int
+
+
+class Command(t.NamedTuple):
+    rule: str
+    name: str
+    is_group: bool
+    min_items: int
+    max_items: t.Optional[int]
+    limit: int
+    tokens: t.Dict[str, t.Union[Param, str]]
+
+
+class Table(t.NamedTuple):
+    root: str
+    commands: t.Dict[str, Command]
+
+
+# (rule, value) for parameters, with value None for flags;
+# (rule, children) for commands.
+Parsed = t.Tuple[str, t.Any]
+
+
+def split_option_values(
+    args: t.Sequence[str], value_decls: t.AbstractSet[str]
+) -> t.List[str]:
+    """Split ``--opt=value`` arguments into ``--opt`` and ``value``."""
+    out = []
+    for arg in args:
+        decl, equals, value = arg.partition("=")
+        if equals and decl in value_decls:
+            out += [decl, value]
+        else:
+            out.append(arg)
+    return out
+
+
+def is_complete(command: Command, items: list) -> bool:
+    if command.is_group:
+        return len(items) >= 1
+    if command.max_items is not None and len(items) > command.max_items:
+        return False
+    return len(items) >= command.min_items
+
+
+def parse(table: Table, tokens: t.Sequence[str]) -> t.Optional[Parsed]:
+    """Parse ``tokens`` if they have exactly one interpretation, else return None."""
+    root = table.commands[table.root]
+    if not tokens or tokens[0] != root.name:
+        return None
+
+    stack = [(root, [], collections.Counter())]
+
+    def close() -> bool:
+        command, items, _counts = stack.pop()
+        if not is_complete(command, items):
+            return False
+        stack[-1][1].append((command.rule, items))
+        return True
+
+    position = 1
+    while position < len(tokens):
+        token = tokens[position]
+        levels = [
+            level
+            for level, (command, _items, _counts) in enumerate(stack)
+            if token in command.tokens
+        ]
+        if len(levels) != 1:
+            return None
+        [level] = levels
+        while len(stack) - 1 > level:
+            if not close():
+                return None
+
+        command, items, counts = stack[-1]
+        target = command.tokens[token]
+        if isinstance(target, Param):
+            if not target.takes_value:
+                items.append((target.rule, None))
+                position += 1
+            elif position + 1 < len(tokens):
+                items.append((target.rule, tokens[position + 1]))
+                position += 2
+            else:
+                return None
+            rule, limit = target.rule, target.limit
+        else:
+            child = table.commands[target]
+            stack.append((child, [], collections.Counter()))
+            rule, limit = child.rule, child.limit
+            position += 1
+
+        counts[rule] += 1
+        if counts[rule] > limit:
+            return None
+
+    while len(stack) > 1:
+        if not close():
+            return None
+    command, items, _counts = stack.pop()
+    if not is_complete(command, items):
+        return None
+    return command.rule, items
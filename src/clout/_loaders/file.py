@@ -0,0 +1,204 @@
+import collections
+import collections.abc
+import configparser
+import copy
+import json
+import os
+import pathlib
+import typing as t
+
+import appdirs
+import attr
+import marshmallow
+
+from .. import _util
+from .. import exceptions
+from . import schemas
+
+
+def read_json(text: str) -> dict:
+    return json.loads(text)
+
+
+def read_toml(text: str) -> dict:
+    import toml
+
+    return toml.loads(text)
+
+
+def read_yaml(text: str) -> dict:
+    import yaml
+
+    return yaml.safe_load(text) or {}
+
+
+def read_ini(text: str) -> dict:
+    """Read sections as nested dicts, splitting section names on dots."""
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string(text)
+    d: dict = dict(parser.defaults())
+    for section in parser.sections():
+        node = d
+        for key in section.split("."):
+            node = node.setdefault(key, {})
+        node.update(
+            (key, value)
+            for key, value in parser.items(section, raw=True)
+            if key not in parser.defaults()
+        )
+    return d
+
+
+READERS: t.Dict[str, t.Callable[[str], dict]] = {
+    "json": read_json,
+    "toml": read_toml,
+    "yaml": read_yaml,
+    "ini": read_ini,
+}
+
+SUFFIX_TO_FORMAT = {
+    ".json": "json",
+    ".toml": "toml",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".ini": "ini",
+    ".cfg": "ini",
+}
+
+
+def detect_format(path: os.PathLike) -> str:
+    suffix = pathlib.Path(path).suffix.lower()
+    try:
+        return SUFFIX_TO_FORMAT[suffix]
+    except KeyError:
+        raise ValueError(
+            f"Cannot tell the format of {path}, pass one of {sorted(READERS)}"
+        ) from None
+
+
+Fingerprint = t.Tuple[int, int, int]
+
+
+def fingerprint(path: os.PathLike) -> t.Optional[Fingerprint]:
+    """Return ``(mtime, size, inode)`` for ``path``, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+_PARSED: t.MutableMapping[
+    t.Tuple[str, str], t.Tuple[Fingerprint, t.Any]
+] = collections.OrderedDict()
+MAX_PARSED_FILES = 64
+
+
+def read_file(path: os.PathLike, format: t.Optional[str] = None) -> dict:
+    """Parse the file at ``path``, or copy the last result if it is unchanged."""
+    path = os.path.abspath(path)
+    format = format or detect_format(path)
+    key = (path, format)
+    current = fingerprint(path)
+    if current is None:
+        raise FileNotFoundError(path)
+    cached = _PARSED.get(key)
+    if cached is None or cached[0] != current:
+        with open(path, encoding="utf-8") as f:
+            cached = _PARSED[key] = (current, READERS[format](f.read()))
+        while len(_PARSED) > MAX_PARSED_FILES:
+            _PARSED.popitem(last=False)
+    else:
+        _PARSED.move_to_end(key)
+    # Callers may change what they get without changing the cache.
+    return copy.deepcopy(cached[1])
+
+
+def clear_file_cache() -> None:
+    _PARSED.clear()
+
+
+def check_mapping(path: os.PathLike, data, section: t.Optional[str] = None) -> None:
+    if not isinstance(data, collections.abc.Mapping):
+        raise exceptions.InvalidFile(path, data, section)
+
+
+def select(
+    schema: marshmallow.Schema, data: t.Mapping, source: t.Optional[str] = None
+) -> dict:
+    """Keep only the keys of ``data`` that ``schema`` has fields for.
+
+    With a ``source``, values are wrapped in :class:`~clout._util.RawValue`.
+    """
+    selected = {}
+    for name, field in schema.fields.items():
+        key = field.data_key or name
+        if key not in data:
+            continue
+        value = data[key]
+        if isinstance(field, marshmallow.fields.Nested) and isinstance(
+            value, collections.abc.Mapping
+        ):
+            value = select(field.schema, value, source)
+        elif source is not None:
+            value = _util.RawValue(value, source)
+        selected[key] = value
+    return selected
+
+
+@attr.dataclass
+class File:
+    """Load a json, toml, yaml or ini file.
+
+    Without a ``path``, read ``config.toml`` in the user config directory of
+    ``app_name``. A missing file loads as an empty dict. If ``section`` is set,
+    only that top-level key of the file is loaded. With ``raw``, values are
+    :class:`~clout._util.RawValue` with the file path as their source.
+    """
+
+    path: t.Optional[os.PathLike] = None
+    app_name: str = None
+    format: t.Optional[str] = None
+    section: t.Optional[str] = None
+    metadata_key: str = "file"
+    inherits: t.FrozenSet[str] = frozenset({"app_name", "raw"})
+    raw: bool = False
+
+    def get_path(self) -> pathlib.Path:
+        if self.path is not None:
+            return pathlib.Path(self.path)
+        if self.app_name is None:
+            raise ValueError("File needs a path or an app_name")
+        return pathlib.Path(appdirs.user_config_dir(self.app_name)) / "config.toml"
+
+    def fingerprint(self) -> t.Optional[Fingerprint]:
+        return fingerprint(self.get_path())
+
+    def prep(self, typ, metadata=None, default=None):
+        path = self.get_path()
+        try:
+            data = read_file(path, self.format)
+        except FileNotFoundError:
+            return {}
+        check_mapping(path, data)
+        if self.section is not None:
+            data = data.get(self.section, {})
+            check_mapping(path, data, self.section)
+        source = str(path) if self.raw else None
+        return select(schemas.get_schema(typ), data, source)
+
+    def set(self, **kw):
+        return attr.evolve(self, **kw)
+
+
+def load_file(type: t.Type, path: os.PathLike, section: t.Optional[str] = None):
+    """Load the parts of a config file that a class has fields for into a dict.
+
+    .. code-block:: python
+
+        d = clout.load_file(Database, "config.toml", section="db")
+
+    The format is picked from the file suffix: ``.json``, ``.toml``, ``.yaml``,
+    ``.yml``, ``.ini`` or ``.cfg``.
+    """
+    return File(path=path, section=section).prep(type)
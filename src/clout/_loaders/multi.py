@@ -1,20 +1,74 @@
+import asyncio
 import collections
 import collections.abc
+import concurrent.futures
+import threading
+import time
 import typing as t
 
 import attr
-import desert
 import marshmallow
 
 from .. import exceptions
+from . import schemas
+
+
+@attr.dataclass(frozen=True)
+class LoaderResult:
+    """What a loader returned, and how many seconds it took."""
+
+    loader: t.Any
+    data: t.Mapping
+    seconds: float
+
+
+def run_loader(loader, cls) -> LoaderResult:
+    start = time.perf_counter()
+    data = loader.prep(cls) or {}
+    return LoaderResult(loader, data, time.perf_counter() - start)
+
+
+async def arun_loader(
+    loader, cls, timeout: t.Optional[float] = None
+) -> LoaderResult:
+    start = time.perf_counter()
+    if hasattr(loader, "aprep"):
+        awaitable = loader.aprep(cls)
+    else:
+        loop = asyncio.get_running_loop()
+        awaitable = loop.run_in_executor(None, loader.prep, cls)
+    try:
+        data = await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise exceptions.LoaderTimeout(loader, timeout) from None
+    return LoaderResult(loader, data or {}, time.perf_counter() - start)
 
 
 @attr.dataclass(frozen=True)
 class Multi:
+    """Combine the data from several loaders, the first loader taking precedence.
+
+    With ``concurrent=True`` the loaders run on a thread pool of ``max_workers``
+    threads (one per loader by default), and each loader must finish within
+    ``timeout`` seconds of starting, or :class:`clout.exceptions.LoaderTimeout` is
+    raised. Time a loader spends queued behind the others does not count.
+
+    :meth:`abuild` awaits the loaders together instead, calling ``aprep`` on
+    loaders that have it and running ``prep`` in the default executor otherwise.
+
+    Loaders are given the entries of ``data`` they inherit. With
+    ``data={"raw": True}`` they return :class:`~clout._util.RawValue` leaves
+    carrying their source, and each field is converted once, on the value that
+    takes precedence.
+    """
+
     loaders: t.List = attr.ib(factory=list)
     inherits: t.FrozenSet[str] = attr.ib(default=frozenset())
     metadata_key: str = "cli"
     data: dict = attr.ib(factory=dict)
+    concurrent: bool = False
+    max_workers: t.Optional[int] = None
+    timeout: t.Optional[float] = None
 
     def set(self, **kw):
         return attr.evolve(self, **kw)
@@ -29,19 +83,87 @@ class Multi:
             )
         return self.set(loaders=loaders)
 
+    def fingerprint(self) -> t.Hashable:
+        """Combine the fingerprints of the loaders that have one."""
+        return tuple(
+            loader.fingerprint() if hasattr(loader, "fingerprint") else None
+            for loader in self.set_data_on_loaders().loaders
+        )
+
+    def run_loaders(self, cls) -> t.List[LoaderResult]:
+        """Run each loader, returning the results in the order of the loaders."""
+        multi = self.set_data_on_loaders()
+        if not multi.concurrent or len(multi.loaders) < 2:
+            return [run_loader(loader, cls) for loader in multi.loaders]
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=multi.max_workers or len(multi.loaders),
+            thread_name_prefix="clout-loader",
+        )
+        started = [threading.Event() for _ in multi.loaders]
+        start_times = [0.0 for _ in multi.loaders]
+
+        def start(position: int, loader) -> LoaderResult:
+            start_times[position] = time.monotonic()
+            started[position].set()
+            return run_loader(loader, cls)
+
+        futures: t.List[concurrent.futures.Future] = []
+        try:
+            futures = [
+                executor.submit(start, position, loader)
+                for position, loader in enumerate(multi.loaders)
+            ]
+            results = []
+            for position, (loader, future) in enumerate(zip(multi.loaders, futures)):
+                remaining = None
+                if multi.timeout is not None:
+                    # The loaders before this one are done, so it starts next.
+                    started[position].wait()
+                    deadline = start_times[position] + multi.timeout
+                    remaining = max(0.0, deadline - time.monotonic())
+                try:
+                    results.append(future.result(timeout=remaining))
+                except concurrent.futures.TimeoutError:
+                    raise exceptions.LoaderTimeout(loader, multi.timeout) from None
+            return results
+        finally:
+            # Do not wait for a loader that timed out.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
     def prep(self, cls):
+        return DeepChainMap(*[result.data for result in self.run_loaders(cls)])
+
+    async def arun_loaders(self, cls) -> t.List[LoaderResult]:
         multi = self.set_data_on_loaders()
-        return DeepChainMap(*[loader.prep(cls) or {} for loader in multi.loaders])
+        return list(
+            await asyncio.gather(
+                *[arun_loader(loader, cls, multi.timeout) for loader in multi.loaders]
+            )
+        )
+
+    async def aprep(self, cls):
+        return DeepChainMap(*[result.data for result in await self.arun_loaders(cls)])
 
     def build(self, cls):
-        schema = desert.schema_class(cls)()
-        prepped = self.prep(cls)
+        return self.load(cls, self.prep(cls))
+
+    async def abuild(self, cls):
+        return self.load(cls, await self.aprep(cls))
+
+    def load(self, cls, prepped):
+        load = schemas.get_loader(cls)
         try:
-            return schema.load(prepped)
+            return load(prepped)
         except marshmallow.exceptions.ValidationError as e:
             raise exceptions.ValidationError(*e.args) from e
 
 
+Path = t.Tuple[str, ...]
+
+
 class DeepChainMap(collections.ChainMap):
     """Combine multiple dicts into a deep mapping.
 
@@ -53,12 +175,145 @@ class DeepChainMap(collections.ChainMap):
     >>> dcm = clout.DeepChainMap(*maps)
     >>> dcm["a"]["b"]["c"]
     1337
+    >>> dcm.to_dict()
+    {'a': {'b': {'c': 1337}}}
+    >>> dcm.flatten()
+    {('a', 'b', 'c'): 1337}
 
 
+    Nested views, the key index and the flattened leaves are cached. Writes
+    through the chain map or its views invalidate them. Changing one of
+    ``maps`` directly is not supported: the change is not seen until
+    :meth:`invalidate` is called, and views returned before then stay stale.
     """
 
+    def __init__(self, *maps):
+        super().__init__(*maps)
+        self._parent: t.Optional["DeepChainMap"] = None
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Drop the cached views and indexes of this map and its parents."""
+        self._children: t.Dict[t.Hashable, "DeepChainMap"] = {}
+        self._index: t.Optional[t.Dict[t.Hashable, t.Tuple[int, ...]]] = None
+        self._leaves: t.Optional[t.Dict[Path, t.Tuple[t.Any, int]]] = None
+        if self._parent is not None:
+            self._parent.invalidate()
+
+    def index(self) -> t.Dict[t.Hashable, t.Tuple[int, ...]]:
+        """Map each key to the positions of the maps that have it, first to last."""
+        if self._index is None:
+            index: t.Dict[t.Hashable, t.Tuple[int, ...]] = {}
+            # Same key order as ChainMap iteration: last map first.
+            for position in reversed(range(len(self.maps))):
+                for key in self.maps[position]:
+                    index[key] = (position,) + index.get(key, ())
+            self._index = index
+        return self._index
+
     def __getitem__(self, key):
-        value = super().__getitem__(key)
+        try:
+            positions = self.index()[key]
+        except KeyError:
+            return self.__missing__(key)
+        value = self.maps[positions[0]][key]
+        if not isinstance(value, collections.abc.Mapping):
+            return value
+        child = self._children.get(key)
+        if child is None:
+            child = type(self)(
+                *[
+                    self.maps[position][key]
+                    for position in positions
+                    if isinstance(self.maps[position][key], collections.abc.Mapping)
+                ]
+            )
+            child._parent = self
+            self._children[key] = child
+        return child
+
+    def __contains__(self, key):
+        return key in self.index()
+
+    def __len__(self):
+        return len(self.index())
+
+    def __iter__(self):
+        return iter(self.index())
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def popitem(self):
+        try:
+            return super().popitem()
+        finally:
+            self.invalidate()
+
+    def pop(self, key, *args):
+        try:
+            return super().pop(key, *args)
+        finally:
+            self.invalidate()
+
+    def clear(self):
+        super().clear()
+        self.invalidate()
+
+    def to_dict(self) -> dict:
+        """Merge all maps into one nested dict, visiting each key once per map."""
+        merged: dict = {}
+        for mapping in reversed(self.maps):
+            _merge_into(merged, mapping)
+        return merged
+
+    def flatten(self) -> t.Dict[Path, t.Any]:
+        """Map the path of each leaf value to that value."""
+        return {path: value for path, (value, _) in self._get_leaves().items()}
+
+    def sources(self) -> t.Dict[Path, int]:
+        """Map the path of each leaf value to the position of the map it came from."""
+        return {path: position for path, (_, position) in self._get_leaves().items()}
+
+    def _get_leaves(self) -> t.Dict[Path, t.Tuple[t.Any, int]]:
+        if self._leaves is None:
+            leaves: t.Dict[Path, t.Tuple[t.Any, int]] = {}
+            # Whether the first value seen at a path was a mapping. Later maps
+            # only add to paths where every earlier value was a mapping.
+            is_mapping: t.Dict[Path, bool] = {}
+            for position, mapping in enumerate(self.maps):
+                _collect_leaves(mapping, (), position, leaves, is_mapping)
+            self._leaves = leaves
+        return self._leaves
+
+
+def _merge_into(merged: dict, mapping: t.Mapping) -> None:
+    for key, value in mapping.items():
         if isinstance(value, collections.abc.Mapping):
-            return type(self)(*[m[key] for m in self.maps if key in m])
-        return value
+            existing = merged.get(key)
+            if not isinstance(existing, dict):
+                existing = merged[key] = {}
+            _merge_into(existing, value)
+        else:
+            merged[key] = value
+
+
+def _collect_leaves(mapping, prefix, position, leaves, is_mapping) -> None:
+    for key, value in mapping.items():
+        path = prefix + (key,)
+        value_is_mapping = isinstance(value, collections.abc.Mapping)
+        seen = is_mapping.setdefault(path, value_is_mapping)
+        if not value_is_mapping:
+            if not seen:
+                leaves.setdefault(path, (value, position))
+        elif seen:
+            _collect_leaves(value, path, position, leaves, is_mapping)
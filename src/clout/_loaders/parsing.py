@@ -1,10 +1,18 @@
 import collections
+import copy
+import copyreg
 import functools
+import hashlib
 import math
+import multiprocessing
 import os
+import pickle
+import re
 import shlex
 import subprocess
 import sys
+import tempfile
+import threading
 import typing as t
 
 import attr
@@ -14,6 +22,8 @@ import lark
 import clout.exceptions
 
 from .. import _util
+from . import fastpath
+from . import timing
 
 
 ALWAYS_ACCEPT = True
@@ -61,8 +71,27 @@ def one_of(items):
     return par(" | ".join(items))
 
 
+def make_rule_name(kind: str, path: t.Sequence[str]) -> str:
+    parts = (re.sub(r"[^a-z0-9_]", "_", p.lstrip("-").lower()) for p in path)
+    return "__".join((kind, *parts))
+
+
+def assign_rule_names(grp: click.BaseCommand, path: t.Tuple[str, ...] = ()) -> None:
+    """Name the grammar rule of every command and parameter after its path.
+
+    The names only depend on the command tree, so the same tree produces the
+    same grammar in every process.
+    """
+    path += (grp.name,)
+    grp.rule_name = make_rule_name("cmd", path)
+    for param in grp.params:
+        param.rule_name = make_rule_name("param", path + (param.name,))
+    for cmd in getattr(grp, "commands", {}).values():
+        assign_rule_names(cmd, path)
+
+
 def name_rule(obj) -> str:
-    return f"{obj.name.lstrip('-').replace('-', '_')}_{id(obj)}"
+    return obj.rule_name
 
 
 @to_lark.register
@@ -75,7 +104,7 @@ def _(option: click.Option):
         )
     return (
         f"{name_rule(option)} : "
-        + one_of(quote(decl) + ' "="? value' for decl in option.opts)
+        + one_of(quote(decl) + " value" for decl in option.opts)
         + "\n"
     )
 
@@ -135,17 +164,107 @@ def _(grp: CountingGroup):
     return out
 
 
+def get_literals(grp: click.BaseCommand) -> t.List[str]:
+    """Return the command names and option declarations used in the grammar."""
+    literals = []
+    for cmd in get_base_commands(grp):
+        literals.append(cmd.name)
+        for param in cmd.params:
+            if isinstance(param, click.Option):
+                literals.extend(param.opts)
+    return list(dict.fromkeys(literals))
+
+
 def build_grammar(grp):
+    assign_rule_names(grp)
     grammar = to_lark(grp)
-    grammar += "?value : /\\S+/\n"
+    # Each argv element is one token, so a value may also spell a literal.
+    values = ["VALUE"] + [quote(literal) for literal in get_literals(grp)]
+    grammar += f"!?value : {' | '.join(values)}\n"
     grammar += f"?start : {name_rule(grp)}\n"
-    grammar += "%import common.CNAME\n"
-    grammar += "%import common.WS -> _WHITE\n"
-    grammar += "%ignore _WHITE\n"
+    grammar += "VALUE : /.+/s\n"
 
     return grammar
 
 
+class ArgvLexer(lark.lexer.Lexer):
+    """Lex a list of arguments, one token per element."""
+
+    def __init__(self, terminals: t.Iterable[lark.lexer.TerminalDef]):
+        self.literals = {
+            term.pattern.value: term.name
+            for term in terminals
+            if isinstance(term.pattern, lark.lexer.PatternStr)
+        }
+        self.spellings = {name: literal for literal, name in self.literals.items()}
+
+    def spell(self, name: str) -> str:
+        """Return the literal text of terminal ``name``, or the name itself."""
+        return self.spellings.get(name, name)
+
+    def lex(self, args: t.Sequence[str]) -> t.Iterator[lark.Token]:
+        for position, arg in enumerate(args):
+            yield lark.Token(self.literals.get(arg, "VALUE"), arg, position)
+
+
+def make_lark_parser(grammar: str) -> lark.Lark:
+    parser = lark.Lark(
+        grammar, parser="earley", lexer="standard", ambiguity="explicit"
+    )
+    parser.parser.lexer = ArgvLexer(parser.terminals)
+    return parser
+
+
+split_option_values = fastpath.split_option_values
+
+
+def build_table(grp: click.BaseCommand) -> t.Optional[fastpath.Table]:
+    """Build the :mod:`~clout._loaders.fastpath` table for ``grp``.
+
+    Returns None for trees the fast path does not handle, such as those with
+    positional arguments.
+    """
+    assign_rule_names(grp)
+    commands = {}
+    for cmd in get_base_commands(grp):
+        tokens: t.Dict[str, t.Union[fastpath.Param, str]] = {}
+        for param in cmd.params:
+            if not isinstance(param, click.Option) or param.nargs == -1:
+                return None
+            for decl in param.opts:
+                if decl in tokens:
+                    return None
+                tokens[decl] = fastpath.Param(
+                    name_rule(param), not param.is_flag, param.nargs
+                )
+        for sub in getattr(cmd, "commands", {}).values():
+            if sub.name in tokens:
+                return None
+            tokens[sub.name] = name_rule(sub)
+
+        max_items = max_params(cmd)
+        commands[name_rule(cmd)] = fastpath.Command(
+            rule=name_rule(cmd),
+            name=cmd.name,
+            is_group=bool(getattr(cmd, "commands", None)),
+            min_items=min_params(cmd),
+            max_items=None if max_items == math.inf else max_items,
+            limit=getattr(cmd, "nargs", 1),
+            tokens=tokens,
+        )
+    return fastpath.Table(name_rule(grp), commands)
+
+
+def to_tree(parsed: fastpath.Parsed) -> lark.Tree:
+    """Convert a fast-path parse into the tree the Earley parser would produce."""
+    rule, value = parsed
+    if isinstance(value, list):
+        return lark.Tree(rule, [to_tree(child) for child in value])
+    if value is None:
+        return lark.Tree(rule, [])
+    return lark.Tree(rule, [lark.Token("VALUE", value)])
+
+
 def get_base_commands(grp: click.BaseCommand) -> t.Iterator[click.BaseCommand]:
     yield grp
     if not hasattr(grp, "commands"):
@@ -154,30 +273,220 @@ def get_base_commands(grp: click.BaseCommand) -> t.Iterator[click.BaseCommand]:
         yield from get_base_commands(cmd)
 
 
-class Walker(lark.Visitor):
-    def __init__(self, *args, group, **kwargs):
-        self.group = group
-        super().__init__(*args, **kwargs)
-        base_commands = list(get_base_commands(self.group))
-        self.all_param_names = {name_rule(p) for c in base_commands for p in c.params}
-        for cmd in base_commands:
-            name, method = self.make_validation_method(cmd)
-            setattr(self, name, method)
+def structure_key(obj) -> tuple:
+    """Describe the parts of a command tree that determine its grammar."""
+    if isinstance(obj, click.Parameter):
+        return (
+            type(obj),
+            obj.name,
+            tuple(obj.opts),
+            getattr(obj, "is_flag", False),
+            obj.nargs,
+            obj.multiple,
+            obj.required,
+            bool(obj.default),
+        )
+    return (
+        type(obj),
+        obj.name,
+        getattr(obj, "nargs", 1),
+        getattr(obj, "required", False),
+        tuple(structure_key(p) for p in obj.params),
+        tuple(structure_key(c) for c in getattr(obj, "commands", {}).values()),
+    )
 
-    def make_validation_method(self, command):
-        def param_validation_method(parsed_command):
 
-            counter = collections.Counter(p.data for p in parsed_command.children)
+# Bump when the pickled parsers change shape, e.g. a new ArgvLexer attribute.
+CACHE_FORMAT = "1"
 
-            for param_or_cmd in list(command.params) + list(
-                getattr(command, "commands", {}).values()
-            ):
-                param_or_cmd_id = name_rule(param_or_cmd)
-                observed = counter.get(param_or_cmd_id, 0)
-                if observed > param_or_cmd.nargs:
-                    raise TooManyArgs(param_or_cmd)
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "disk_hits", "currsize"]
+)
+
+
+default_cache_dir = _util.default_cache_dir
 
-        return name_rule(command), param_validation_method
+
+def parser_cache_dir() -> t.Optional[str]:
+    """Return the directory to pickle parsers in, if ``CLOUT_PARSER_CACHE=1``.
+
+    Unpickling runs code, so the disk cache is off unless asked for.
+    """
+    if not int(os.environ.get("CLOUT_PARSER_CACHE", 0)):
+        return None
+    return default_cache_dir()
+
+
+def is_private(path: str) -> bool:
+    """Whether only the current user owns and can write ``path``."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return True
+    return stat.st_uid == os.getuid() and not stat.st_mode & 0o022
+
+
+def _reduce_lark_options(options):
+    # LarkOptions.__getattr__ recurses when unpickled without its ``options`` dict.
+    return lark.lark.LarkOptions, (options.options,)
+
+
+def dump_parser(parser: lark.Lark, f: t.BinaryIO) -> None:
+    pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = copyreg.dispatch_table.copy()
+    pickler.dispatch_table[lark.lark.LarkOptions] = _reduce_lark_options
+    pickler.dump(parser)
+
+
+class ParserCache:
+    """Compiled Lark parsers, keyed on the structure of their command tree.
+
+    Parsers are kept in memory for the life of the process and, when
+    ``directory`` is set, pickled there under a hash of their grammar so that
+    later processes can load them instead of rebuilding them. Pickles are only
+    loaded from a directory and files that no other user owns or can write,
+    and only the ``max_files`` most recently used are kept.
+    """
+
+    def __init__(self, directory: t.Optional[str] = None, max_files: int = 32):
+        self.directory = directory
+        self.max_files = max_files
+        self._entries: t.Dict[tuple, t.Tuple[str, lark.Lark]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get(self, group) -> t.Tuple[str, lark.Lark]:
+        """Return the grammar and parser for ``group``."""
+        key = structure_key(group)
+        try:
+            entry = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            with timing.phase("grammar"):
+                grammar = build_grammar(group)
+            with timing.phase("lark"):
+                entry = self._entries[key] = grammar, self.load_or_build(grammar)
+        else:
+            self.hits += 1
+        return entry
+
+    def path(self, grammar: str) -> t.Optional[str]:
+        if self.directory is None:
+            return None
+        key = "\0".join([CACHE_FORMAT, lark.__version__, sys.version, grammar])
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"parser-{digest}.pickle")
+
+    def load_or_build(self, grammar: str) -> lark.Lark:
+        path = self.path(grammar)
+        if path is not None and is_private(self.directory) and is_private(path):
+            try:
+                with open(path, "rb") as f:
+                    parser = pickle.load(f)
+                os.utime(path)
+            except Exception:  # pylint: disable=broad-except
+                # Stale or truncated cache files are rebuilt below.
+                pass
+            else:
+                self.disk_hits += 1
+                return parser
+
+        parser = make_lark_parser(grammar)
+        if path is not None:
+            self.save(parser, path)
+        return parser
+
+    def save(self, parser: lark.Lark, path: str) -> None:
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            if not is_private(self.directory):
+                return
+            with tempfile.NamedTemporaryFile(
+                "wb", dir=self.directory, delete=False
+            ) as f:
+                dump_parser(parser, f)
+            os.replace(f.name, path)
+            self.evict()
+        except (OSError, pickle.PicklingError):
+            pass
+
+    def evict(self) -> None:
+        """Delete the least recently used pickles beyond ``max_files``."""
+        paths = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.startswith("parser-") and name.endswith(".pickle")
+        ]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self.max_files :]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.disk_hits, len(self._entries))
+
+    def cache_clear(self):
+        """Forget the in-memory parsers and counters. Files on disk are kept."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+
+PARSER_CACHE = ParserCache(directory=parser_cache_dir())
+
+
+class Validator:
+    """Check parse trees against the counts allowed by a command tree.
+
+    Built once per group and shared by every ambiguity it has to resolve.
+    """
+
+    def __init__(self, group):
+        self.limits: t.Dict[str, t.Dict[str, int]] = {}
+        self.always_invalid: t.Set[str] = set()
+        for cmd in get_base_commands(group):
+            children = list(cmd.params) + list(getattr(cmd, "commands", {}).values())
+            limits = {name_rule(child): child.nargs for child in children}
+            self.limits[name_rule(cmd)] = limits
+            if any(nargs < 0 for nargs in limits.values()):
+                # An unobserved child with nargs=-1 already exceeds its limit.
+                self.always_invalid.add(name_rule(cmd))
+
+    def is_valid(self, tree: lark.Tree, memo: t.Dict[int, bool]) -> bool:
+        """Return whether no command in ``tree`` has too many of a child.
+
+        ``memo`` maps ids of subtrees already checked to their validity.
+        """
+        try:
+            return memo[id(tree)]
+        except KeyError:
+            pass
+        valid = self.is_valid_node(tree) and all(
+            self.is_valid(child, memo)
+            for child in tree.children
+            if isinstance(child, lark.Tree)
+        )
+        memo[id(tree)] = valid
+        return valid
+
+    def is_valid_node(self, tree: lark.Tree) -> bool:
+        limits = self.limits.get(tree.data)
+        if limits is None:
+            return True
+        if tree.data in self.always_invalid:
+            return False
+        counter = collections.Counter(
+            child.data for child in tree.children if isinstance(child, lark.Tree)
+        )
+        return all(
+            observed <= limits.get(data, math.inf) for data, observed in counter.items()
+        )
 
 
 class CLIParsingErrorException(Exception):
@@ -200,13 +509,41 @@ class AmbiguousArgs(CLIParsingErrorException):
     pass
 
 
+# Click types that accept the same strings as the marshmallow fields cli maps to
+# them, so parameters of these types can be left for the field to convert.
+RAW_TYPES = {click.STRING, click.INT, click.FLOAT, click.BOOL}
+
+
+def is_raw_param(param: click.Parameter) -> bool:
+    return param.callback is None and (
+        param.type in RAW_TYPES or hasattr(param.type, "field")
+    )
+
+
+Converter = t.Callable[[click.Context, t.Any], t.Any]
+
+
 class Transformer(lark.Transformer):
-    def __init__(self, *args, group, use_defaults, **kwargs):
+    """Turn a parse tree of ``group`` into nested dicts of parameter values.
+
+    Get one with :func:`get_transformer`, which builds the rule methods and the
+    parameter converters once per group. Each :meth:`transform` makes at most one
+    click context per command.
+    """
+
+    def __init__(self, *args, group, use_defaults, raw=False, **kwargs):
         self.group = group
         self.use_defaults = use_defaults
+        self.raw = raw
         super().__init__(*args, **kwargs)
+        self._local = threading.local()
         base_commands = list(get_base_commands(self.group))
         self.all_param_names = {name_rule(p) for c in base_commands for p in c.params}
+        self.converters: t.Dict[click.Parameter, Converter] = {
+            param: self.make_converter(param)
+            for cmd in base_commands
+            for param in cmd.params
+        }
         for cmd in base_commands:
             if isinstance(cmd, CountingCommand) and not isinstance(
                 cmd, click.MultiCommand
@@ -222,14 +559,33 @@ class Transformer(lark.Transformer):
                 name, method = self.make_group_method(cmd)
                 setattr(self, name, method)
 
+    def make_converter(self, param: click.Parameter) -> Converter:
+        if self.raw and is_raw_param(param):
+            source = param.opts[0]
+            return lambda _ctx, value: _util.RawValue(value, source)
+        return param.process_value
+
+    def transform(self, tree):
+        self._local.contexts = {}
+        try:
+            return super().transform(tree)
+        finally:
+            self._local.contexts = {}
+
+    def get_context(self, command: click.BaseCommand) -> click.Context:
+        contexts = self._local.contexts
+        ctx = contexts.get(command)
+        if ctx is None:
+            ctx = contexts[command] = click.Context(command)
+        return ctx
+
     def process_params(self, command, parsed):
 
         d = {}
         for param, value in parsed:
 
             if param.name == "--help":
-                print(command.get_help(click.Context(command)))
-                sys.exit()
+                raise HelpRequested(command.get_help(self.get_context(command)))
             if isinstance(param, click.Parameter):
                 value = str(value)
             if param.multiple or param.nargs != 1:
@@ -240,11 +596,8 @@ class Transformer(lark.Transformer):
         out = {}
         for param, value in d.items():
             if isinstance(param, click.Parameter):
-                try:
-                    out[param.name] = param.process_value(click.Context(command), value)
-                except click.exceptions.BadParameter as e:
-                    # XXX
-                    raise
+                converter = self.converters[param]
+                out[param.name] = converter(self.get_context(command), value)
             elif isinstance(param, click.BaseCommand):
 
                 out[param.name] = {k: v for k, v in value.items() if v != _util.UNSET}
@@ -256,6 +609,11 @@ class Transformer(lark.Transformer):
                 if param.name not in out and not param.required:
 
                     out[param.name] = param.default
+        elif self.raw:
+            for param in command.params:
+                raw_default = getattr(param, "raw_default", None)
+                if param.name not in out and raw_default is not None:
+                    out[param.name] = raw_default
 
         return command, out
 
@@ -286,16 +644,58 @@ class Transformer(lark.Transformer):
         return name_rule(param), method
 
 
+_TRANSFORMERS: t.MutableMapping[tuple, Transformer] = collections.OrderedDict()
+MAX_TRANSFORMERS = 64
+
+
+def get_transformer(group, use_defaults: bool, raw: bool = False) -> Transformer:
+    """Return the transformer for ``group``, building it on first use."""
+    key = (group, use_defaults, raw)
+    transformer = _TRANSFORMERS.get(key)
+    if transformer is None:
+        transformer = _TRANSFORMERS[key] = Transformer(
+            group=group, use_defaults=use_defaults, raw=raw
+        )
+        while len(_TRANSFORMERS) > MAX_TRANSFORMERS:
+            _TRANSFORMERS.popitem(last=False)
+    else:
+        _TRANSFORMERS.move_to_end(key)
+    return transformer
+
+
+def forget_transformers(group=None) -> None:
+    """Drop the transformers built for ``group``, or for every group."""
+    for key in list(_TRANSFORMERS):
+        if group is None or key[0] is group:
+            del _TRANSFORMERS[key]
+
+
 class RemoveInvalidBranches(lark.Transformer):
-    def __init__(self, *args, group, **kwargs):
+    def __init__(self, *args, group, validator=None, **kwargs):
         self.group = group
+        self.validator = validator or Validator(group)
         super().__init__(*args, **kwargs)
-        base_commands = list(get_base_commands(self.group))
-        self.all_param_names = {name_rule(p) for c in base_commands for p in c.params}
+        self._transformed: t.Dict[int, t.Any] = {}
+        self._validity: t.Dict[int, bool] = {}
 
-    def _ambig(self, data):
+    def transform(self, tree):
+        try:
+            return super().transform(tree)
+        finally:
+            self._transformed = {}
+            self._validity = {}
+
+    def _transform_tree(self, tree):
+        # Alternatives of an ambiguous parse share subtrees; transform each once
+        # so that its validity is only checked once too.
+        key = id(tree)
+        if key not in self._transformed:
+            self._transformed[key] = super()._transform_tree(tree)
+        return self._transformed[key]
 
-        trees = [tree for tree in data if check_validity(self.group, tree)]
+    def _ambig(self, data):
+        timing.count("ambiguities", 1)
+        trees = [tree for tree in data if self.validator.is_valid(tree, self._validity)]
         if len(trees) == 1:
             return trees[0]
 
@@ -318,30 +718,64 @@ def has_help(tree):
 
 
 def check_validity(group, tree):
-    try:
-        Walker(group=group).visit(tree)
-    except TooManyArgs:
-        return False
-    return True
+    return Validator(group).is_valid(tree, {})
 
 
-def find_missing_input(parser, s: str) -> t.Optional[t.List[str]]:
+def find_missing_input(
+    args: t.List[str],
+    error: lark.exceptions.UnexpectedEOF,
+    value_decls: t.AbstractSet[str],
+) -> t.List[str]:
+    """Return the arguments to show help for after input ended too early.
 
-    words = shlex.split(s)
-    try:
-        parser.parse(subprocess.list2cmdline(words))
-    except lark.exceptions.ParseError:
-        pass
-    else:
-        return None
+    The failed parse has already consumed every argument, so only a trailing
+    option that is still waiting for its value is dropped.
+    """
+    expected = {terminal.name for terminal in error.expected}
+    if args and args[-1] in value_decls and "VALUE" in expected:
+        return args[:-1]
+    return list(args)
 
-    while True:
-        try:
-            parser.parse(subprocess.list2cmdline(words[:-1]))
-        except lark.exceptions.ParseError:
-            words = words[:-1]
-        else:
-            return words
+
+@attr.dataclass(frozen=True)
+class ParseFailure:
+    """Why one command line of a batch could not be parsed."""
+
+    type: str
+    message: str
+
+    @classmethod
+    def from_exception(cls, e: BaseException) -> "ParseFailure":
+        if isinstance(e, SystemExit):
+            return cls("SystemExit", f"exit status {e.code}")
+        return cls(type(e).__qualname__, str(e))
+
+
+@attr.dataclass(frozen=True)
+class ParseResult:
+    """The outcome of parsing one command line of a batch."""
+
+    args: t.Tuple[str, ...]
+    value: t.Any = None
+    error: t.Optional[ParseFailure] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# The parser of a batch worker process, set by the pool that started it.
+_WORKER_PARSER: t.Optional["Parser"] = None
+
+
+def _init_worker(parser: "Parser") -> None:
+    global _WORKER_PARSER  # pylint: disable=global-statement
+    _WORKER_PARSER = parser
+
+
+def _parse_chunk(chunk: t.List[t.Tuple[str, ...]]) -> t.List[ParseResult]:
+    assert _WORKER_PARSER is not None
+    return [_WORKER_PARSER.parse_one(args) for args in chunk]
 
 
 @attr.dataclass
@@ -349,41 +783,155 @@ class Parser:
     group: CountingGroup
     callback: t.Callable = lambda **kw: kw
     use_defaults: bool = True
+    cache: ParserCache = PARSER_CACHE
+    raw: bool = False
+    memo_size: int = 1024
     _id_to_object: t.Dict[str, object] = attr.ib(factory=dict)
+    _table: t.Optional[fastpath.Table] = attr.ib(default=None, init=False)
+    _value_decls: t.FrozenSet[str] = attr.ib(default=frozenset(), init=False)
+    _validator: t.Optional[Validator] = attr.ib(default=None, init=False)
+    _memo: t.MutableMapping[t.Tuple[str, ...], ParseResult] = attr.ib(
+        factory=collections.OrderedDict, init=False
+    )
 
     def __attrs_post_init__(self):
+        self._table = build_table(self.group)
         for cmd in get_base_commands(self.group):
             self._id_to_object[name_rule(cmd)] = cmd
             for param in cmd.params:
                 self._id_to_object[name_rule(param)] = param
+        self._value_decls = frozenset(
+            decl
+            for obj in self._id_to_object.values()
+            if isinstance(obj, click.Option) and not obj.is_flag
+            for decl in obj.opts
+        )
 
     def parse_string(self, s):
-        grammar = build_grammar(self.group)
+        return self.parse_args(shlex.split(s))
+
+    def parse_earley(self, args: t.List[str], standalone: bool = True):
+        """Parse ``args`` with the Earley parser.
+
+        In standalone mode help is printed before exiting and ambiguous
+        arguments are reported on stdout; otherwise :class:`HelpRequested` and
+        :class:`AmbiguousArgs` are raised.
+        """
+        grammar, parser = self.cache.get(self.group)
         if int(os.environ.get("CLI_SHOW_GRAMMAR", 0)):
             print(grammar)
-        parser = lark.Lark(grammar, parser="earley", ambiguity="explicit")
+        timing.count("grammar_rules", grammar.count("\n"))
         try:
-            tree = parser.parse(s)
-        except lark.exceptions.ParseError as e:
-            found = find_missing_input(parser, s)
-            raise clout.exceptions.MissingInput(self.group, s, found) from e
+            with timing.phase("earley"):
+                tree = parser.parse(args)
+        except lark.exceptions.UnexpectedEOF as e:
+            found = find_missing_input(args, e, self._value_decls)
+            expected = sorted(
+                {parser.parser.lexer.spell(terminal.name) for terminal in e.expected}
+            )
+            raise clout.exceptions.MissingInput(
+                self.group, subprocess.list2cmdline(args), found, expected
+            ) from e
 
         try:
-            tree = RemoveInvalidBranches(group=self.group).transform(tree)
-        except AmbiguousArgs:
-            click.echo(
+            if self._validator is None:
+                self._validator = Validator(self.group)
+            with timing.phase("remove_invalid_branches"):
+                tree = RemoveInvalidBranches(
+                    group=self.group, validator=self._validator
+                ).transform(tree)
+        except AmbiguousArgs as e:
+            message = (
                 "The command arguments were ambiguous. Rearranging terms might help."
             )
+            if not standalone:
+                raise AmbiguousArgs(message) from e
+            click.echo(message)
 
-        transformer = Transformer(group=self.group, use_defaults=self.use_defaults)
+        return self.transform(tree, standalone)
+
+    def transform(self, tree: lark.Tree, standalone: bool = True):
+        transformer = get_transformer(self.group, self.use_defaults, self.raw)
 
         try:
-            _group, value = transformer.transform(tree)
+            with timing.phase("transform"):
+                _group, value = transformer.transform(tree)
         except lark.exceptions.VisitError as e:
+            if standalone and isinstance(e.orig_exc, HelpRequested):
+                print(e.orig_exc)
+                sys.exit()
             raise e.orig_exc from e
 
         return value
 
-    def parse_args(self, args: t.List[str]):
-        line = subprocess.list2cmdline(args)
-        return self.parse_string(line)
+    def parse_args(self, args: t.List[str], standalone: bool = True):
+        args = split_option_values(args, self._value_decls)
+        if self._table is not None:
+            with timing.phase("fast_path"):
+                parsed = fastpath.parse(self._table, args)
+            if parsed is not None:
+                return self.transform(to_tree(parsed), standalone)
+
+        return self.parse_earley(args, standalone)
+
+    def parse_one(self, args: t.Sequence[str]) -> ParseResult:
+        """Parse ``args``, returning the error, or the help asked for, instead."""
+        args = tuple(args)
+        try:
+            return ParseResult(
+                args, value=self.parse_args(list(args), standalone=False)
+            )
+        except (Exception, SystemExit) as e:  # pylint: disable=broad-except
+            return ParseResult(args, error=ParseFailure.from_exception(e))
+
+    def parse_many(
+        self,
+        argvs: t.Iterable[t.Sequence[str]],
+        processes: t.Optional[int] = None,
+        chunksize: int = 256,
+    ) -> t.List[ParseResult]:
+        """Parse many command lines, returning one result per command line, in order.
+
+        Results are memoized per command line, keeping the last ``memo_size``.
+        With ``processes`` set, command lines not in the memo are parsed in that
+        many forked processes; where fork is unavailable they are parsed here.
+        """
+        argvs = [tuple(args) for args in argvs]
+        batch = {args: self._memo[args] for args in argvs if args in self._memo}
+        todo = list(dict.fromkeys(args for args in argvs if args not in batch))
+
+        if processes and len(todo) > chunksize and self._can_fork():
+            # Build the Earley parser once, before forking.
+            self.cache.get(self.group)
+            chunks = [todo[i : i + chunksize] for i in range(0, len(todo), chunksize)]
+            # Forked workers get the parser without pickling it.
+            with multiprocessing.get_context("fork").Pool(
+                processes, initializer=_init_worker, initargs=(self,)
+            ) as pool:
+                parsed = [
+                    result
+                    for results in pool.map(_parse_chunk, chunks)
+                    for result in results
+                ]
+        else:
+            parsed = [self.parse_one(args) for args in todo]
+
+        for args in batch:
+            self._memo.move_to_end(args)
+        for result in parsed:
+            batch[result.args] = result
+            self._remember(result)
+        # Memoized values are shared, so hand out copies that callers may change.
+        return [
+            attr.evolve(batch[args], value=copy.deepcopy(batch[args].value))
+            for args in argvs
+        ]
+
+    def _remember(self, result: ParseResult) -> None:
+        self._memo[result.args] = result
+        while len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+
+    @staticmethod
+    def _can_fork() -> bool:
+        return "fork" in multiprocessing.get_all_start_methods()
@@ -0,0 +1,116 @@
+import typing as t
+
+import desert
+import marshmallow
+
+from . import construct
+
+
+_SCHEMAS: t.Dict[type, t.Dict[frozenset, marshmallow.Schema]] = {}
+_LOADERS: t.Dict[type, t.Dict[frozenset, construct.Loader]] = {}
+# Called with the class, or None, whenever the cache is cleared.
+_CLEAR_HOOKS: t.List[t.Callable[[t.Optional[type]], t.Any]] = []
+
+
+def get_schema(
+    cls: type, meta: t.Optional[t.Mapping[str, t.Hashable]] = None
+) -> marshmallow.Schema:
+    """Return the schema for ``cls``, generating it on first use.
+
+    Every loader shares the same instance. ``meta`` is passed to
+    :func:`desert.schema_class` and is part of the cache key. Schemas are not
+    added to marshmallow's class registry, which would keep ``cls`` alive.
+
+    Fields keep the order of the class, so that what is generated from the
+    schema, like the grammar, is the same in every process.
+    """
+    meta = dict(meta or {})
+    per_class = _SCHEMAS.setdefault(cls, {})
+    key = frozenset(meta.items())
+    try:
+        return per_class[key]
+    except KeyError:
+        schema_class = desert.schema_class(cls, meta={"register": False, **meta})
+        unregister(schema_class.__bases__[0])
+        schema = per_class[key] = order_fields(schema_class())
+        return schema
+
+
+def order_fields(
+    schema: marshmallow.Schema, seen: t.Optional[t.Set[int]] = None
+) -> marshmallow.Schema:
+    """Put the fields of ``schema`` and its nested schemas in declaration order.
+
+    Unordered schemas keep their fields in the order of a set of names, which
+    changes with the hash seed.
+    """
+    seen = set() if seen is None else seen
+    if id(schema) in seen:
+        return schema
+    seen.add(id(schema))
+    order = {name: position for position, name in enumerate(schema.declared_fields)}
+    for name in ["fields", "load_fields", "dump_fields"]:
+        fields = getattr(schema, name)
+        setattr(schema, name, dict(sorted(fields.items(), key=lambda i: order[i[0]])))
+    for field in schema.fields.values():
+        if isinstance(field, marshmallow.fields.Nested):
+            order_fields(field.schema, seen)
+    return schema
+
+
+def unregister(schema_class: type) -> None:
+    """Remove ``schema_class`` from marshmallow's class registry.
+
+    desert registers the base class it makes for each dataclass, and the
+    registry keeps the latest one, and so its dataclass, alive.
+    """
+    registry = marshmallow.class_registry._registry  # pylint: disable=protected-access
+    for name in [
+        schema_class.__name__,
+        f"{schema_class.__module__}.{schema_class.__name__}",
+    ]:
+        classes = registry.get(name, [])
+        if schema_class in classes:
+            classes.remove(schema_class)
+            if not classes:
+                del registry[name]
+
+
+def get_loader(
+    cls: type, meta: t.Optional[t.Mapping[str, t.Hashable]] = None
+) -> construct.Loader:
+    """Return the function loading a mapping into ``cls``, generating it on first use.
+
+    It raises the same errors as ``get_schema(cls, meta).load``.
+    """
+    meta = dict(meta or {})
+    per_class = _LOADERS.setdefault(cls, {})
+    key = frozenset(meta.items())
+    try:
+        return per_class[key]
+    except KeyError:
+        loader = per_class[key] = construct.make_loader(cls, get_schema(cls, meta))
+        return loader
+
+
+def clear_schema_cache(cls: t.Optional[type] = None) -> None:
+    """Forget the schemas and loaders generated for ``cls``, or for every class.
+
+    The command trees and environment indexes built from them are forgotten
+    too. Call this after changing a class's fields at runtime, or to release
+    dynamically created classes.
+    """
+    if cls is None:
+        _SCHEMAS.clear()
+        _LOADERS.clear()
+    else:
+        _SCHEMAS.pop(cls, None)
+        _LOADERS.pop(cls, None)
+    for hook in _CLEAR_HOOKS:
+        hook(cls)
+
+
+def on_clear(hook: t.Callable[[t.Optional[type]], t.Any]):
+    """Call ``hook`` with the class, or None for all, when the cache is cleared."""
+    _CLEAR_HOOKS.append(hook)
+    return hook
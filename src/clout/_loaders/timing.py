@@ -0,0 +1,128 @@
+"""Opt-in timing of the phases of building an object from the command line.
+
+Export ``CLI_SHOW_TIMINGS=1`` to print a one-line summary to stderr after each
+build, or register a hook with :func:`add_hook` to receive each :class:`Timings`.
+Nothing is measured while neither is set.
+"""
+import contextlib
+import contextvars
+import functools
+import os
+import sys
+import time
+import typing as t
+
+
+class Timings:
+    """Seconds spent in each phase of one build, and counts describing it."""
+
+    def __init__(self):
+        self.phases: t.Dict[str, float] = {}
+        self.counts: t.Dict[str, int] = {}
+        self.total = 0.0
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, name: str, value: int) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+
+    def as_dict(self) -> t.Dict[str, t.Any]:
+        return {
+            "phases": dict(self.phases),
+            "counts": dict(self.counts),
+            "total": self.total,
+        }
+
+    def summary(self) -> str:
+        phases = " ".join(
+            f"{phase}={seconds * 1000:.2f}ms" for phase, seconds in self.phases.items()
+        )
+        counts = " ".join(f"{name}={value}" for name, value in self.counts.items())
+        line = f"clout timings: total={self.total * 1000:.2f}ms {phases}"
+        return f"{line} | {counts}" if counts else line
+
+
+Hook = t.Callable[[Timings], t.Any]
+
+_HOOKS: t.List[Hook] = []
+_CURRENT: "contextvars.ContextVar[t.Optional[Timings]]" = contextvars.ContextVar(
+    "clout_timings", default=None
+)
+
+
+def add_hook(hook: Hook) -> None:
+    """Call ``hook`` with the :class:`Timings` of every build."""
+    _HOOKS.append(hook)
+
+
+def remove_hook(hook: Hook) -> None:
+    _HOOKS.remove(hook)
+
+
+def enabled() -> bool:
+    return bool(_HOOKS) or bool(int(os.environ.get("CLI_SHOW_TIMINGS", 0)))
+
+
+def active() -> bool:
+    """Whether phases are being measured right now."""
+    return _CURRENT.get() is not None
+
+
+@contextlib.contextmanager
+def record() -> t.Iterator[t.Optional[Timings]]:
+    """Measure the phases run inside the block, then report them.
+
+    Blocks nested in another ``record()`` add to the outer measurement.
+    """
+    timings = _CURRENT.get()
+    if timings is not None or not enabled():
+        yield timings
+        return
+
+    timings = Timings()
+    token = _CURRENT.set(timings)
+    start = time.perf_counter()
+    try:
+        yield timings
+    finally:
+        timings.total = time.perf_counter() - start
+        _CURRENT.reset(token)
+    report(timings)
+
+
+def recorded(func):
+    """Run ``func`` inside :func:`record`."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with record():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def report(timings: Timings) -> None:
+    for hook in list(_HOOKS):
+        hook(timings)
+    if int(os.environ.get("CLI_SHOW_TIMINGS", 0)):
+        print(timings.summary(), file=sys.stderr)
+
+
+@contextlib.contextmanager
+def phase(name: str) -> t.Iterator[None]:
+    timings = _CURRENT.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+def count(name: str, value: int) -> None:
+    timings = _CURRENT.get()
+    if timings is not None:
+        timings.count(name, value)
@@ -0,0 +1,185 @@
+"""Rebuild a configuration object when its sources change.
+
+A :class:`Watcher` polls the loaders of a :class:`~clout._loaders.multi.Multi`.
+Loaders with a ``fingerprint()`` method, such as
+:class:`~clout._loaders.file.File`, are re-run when their fingerprint changes;
+loaders without one are treated as fixed for the life of the process.
+
+Only the parts of the object whose data changed are deserialized again. Nested
+objects whose data is unchanged are reused as they are.
+"""
+import collections.abc
+import dataclasses
+import threading
+import typing as t
+
+import attr
+import marshmallow
+
+from .. import _util
+from .. import exceptions
+from . import multi as multi_
+from . import schemas
+
+
+Path = t.Tuple[str, ...]
+MISSING = object()
+Diff = t.Dict[Path, t.Tuple[t.Any, t.Any]]
+
+
+def get_fingerprint(loader) -> t.Hashable:
+    fingerprint = getattr(loader, "fingerprint", None)
+    return None if fingerprint is None else fingerprint()
+
+
+def diff(old: t.Mapping, new: t.Mapping, prefix: Path = ()) -> Diff:
+    """Map the path of each changed leaf to its ``(old, new)`` values.
+
+    Added and removed leaves have :data:`MISSING` as their old or new value.
+    """
+    changes: Diff = {}
+    for key in {**old, **new}:
+        before, after = old.get(key, MISSING), new.get(key, MISSING)
+        if before == after:
+            continue
+        if isinstance(before, collections.abc.Mapping) and isinstance(
+            after, collections.abc.Mapping
+        ):
+            changes.update(diff(before, after, prefix + (key,)))
+        else:
+            changes[prefix + (key,)] = (before, after)
+    return changes
+
+
+def evolve(obj, **changes):
+    if attr.has(type(obj)):
+        return attr.evolve(obj, **changes)
+    return dataclasses.replace(obj, **changes)
+
+
+def rebuild(schema: marshmallow.Schema, obj, old: t.Mapping, new: t.Mapping):
+    """Load ``new`` into an object, reusing the parts of ``obj`` loaded from ``old``."""
+    if obj is None or set(old) != set(new):
+        return schema.load(_util.unwrap(new))
+    if old == new:
+        return obj
+
+    changes = {}
+    errors = {}
+    for name, field in schema.fields.items():
+        key = field.data_key or name
+        if key not in new or old[key] == new[key]:
+            continue
+        attribute = field.attribute or name
+        try:
+            if (
+                isinstance(field, marshmallow.fields.Nested)
+                and isinstance(old[key], collections.abc.Mapping)
+                and isinstance(new[key], collections.abc.Mapping)
+            ):
+                changes[attribute] = rebuild(
+                    field.schema, getattr(obj, attribute), old[key], new[key]
+                )
+            else:
+                value = _util.unwrap(new[key])
+                changes[attribute] = field.deserialize(value, key, new)
+        except marshmallow.exceptions.ValidationError as e:
+            errors[key] = e.messages
+    if errors:
+        raise marshmallow.exceptions.ValidationError(errors)
+    return evolve(obj, **changes)
+
+
+Callback = t.Callable[[t.Any, Diff], t.Any]
+
+
+class Watcher:
+    """Keep an object built by ``multi`` up to date with its sources.
+
+    Call :meth:`poll` to check the sources once, or :meth:`start` to poll every
+    ``interval`` seconds on a background thread. Each callback is called with
+    the new object and the :func:`diff` of the loaded data. Errors raised while
+    polling in the background are passed to ``on_error`` if given, and stop the
+    thread otherwise.
+    """
+
+    def __init__(
+        self,
+        multi: multi_.Multi,
+        cls: t.Type,
+        callbacks: t.Sequence[Callback] = (),
+        interval: float = 1.0,
+        on_error: t.Optional[t.Callable[[Exception], t.Any]] = None,
+    ):
+        self.cls = cls
+        self.callbacks = list(callbacks)
+        self.interval = interval
+        self.on_error = on_error
+        self.loaders = multi.set_data_on_loaders().loaders
+        self.schema = schemas.get_schema(cls)
+        self.fingerprints = [get_fingerprint(loader) for loader in self.loaders]
+        self.layers = [multi_.run_loader(loader, cls).data for loader in self.loaders]
+        self.data = multi_.DeepChainMap(*self.layers).to_dict()
+        self.value = self.load(None, {}, self.data)
+        self._stop = threading.Event()
+        self._thread: t.Optional[threading.Thread] = None
+
+    def load(self, obj, old: t.Mapping, new: t.Mapping):
+        try:
+            return rebuild(self.schema, obj, old, new)
+        except marshmallow.exceptions.ValidationError as e:
+            raise exceptions.ValidationError(*e.args) from e
+
+    def poll(self) -> Diff:
+        """Re-run the loaders whose sources changed, and rebuild if the data did.
+
+        Nothing is kept from a poll whose data does not load, so the next poll
+        tries the same change again.
+        """
+        changed = False
+        fingerprints = list(self.fingerprints)
+        layers = list(self.layers)
+        for position, loader in enumerate(self.loaders):
+            fingerprint = get_fingerprint(loader)
+            if fingerprint == fingerprints[position]:
+                continue
+            fingerprints[position] = fingerprint
+            layers[position] = multi_.run_loader(loader, self.cls).data
+            changed = True
+        if not changed:
+            return {}
+
+        data = multi_.DeepChainMap(*layers).to_dict()
+        # Callbacks get plain values, also from loaders in raw mode.
+        changes = diff(_util.unwrap(self.data), _util.unwrap(data))
+        value = self.load(self.value, self.data, data) if changes else self.value
+        self.fingerprints, self.layers = fingerprints, layers
+        self.data, self.value = data, value
+        if changes:
+            for callback in self.callbacks:
+                callback(self.value, changes)
+        return changes
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="clout-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception as e:  # pylint: disable=broad-except
+                if self.on_error is None:
+                    raise
+                self.on_error(e)
@@ -1,3 +1,9 @@
+import collections.abc
+import os
+import typing as t
+
+import appdirs
+import attr
 import inflection
 
 
@@ -6,3 +12,31 @@ UNSET = "__UNSET__"
 
 def dasherize(s: str) -> str:
     return inflection.dasherize(inflection.underscore(s)).lower()
+
+
+def default_cache_dir() -> t.Optional[str]:
+    """Return ``$CLOUT_CACHE_DIR``, or the user cache directory if it is unset.
+
+    Setting ``CLOUT_CACHE_DIR`` to an empty string disables the on-disk caches.
+    """
+    directory = os.environ.get("CLOUT_CACHE_DIR")
+    if directory is None:
+        return appdirs.user_cache_dir("clout")
+    return directory or None
+
+
+@attr.dataclass(frozen=True)
+class RawValue:
+    """A value a loader found but did not convert, and where it found it."""
+
+    value: t.Any
+    source: str
+
+
+def unwrap(data):
+    """Replace the :class:`RawValue` leaves of ``data`` by their values."""
+    if isinstance(data, RawValue):
+        return data.value
+    if isinstance(data, collections.abc.Mapping):
+        return {key: unwrap(value) for key, value in data.items()}
+    return data
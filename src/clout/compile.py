@@ -0,0 +1,270 @@
+"""Generate a module that loads a dataclass from the command line.
+
+.. code-block:: bash
+
+    python -m clout.compile mypkg.config:Config -o mypkg/config_cli.py
+
+The generated module has a ``load(args=None)`` function, which reads
+``sys.argv[2:]`` when no arguments are given, as the CLI loader does. It parses
+command lines with a table resolved at generation time and calls the dataclass
+directly, so it imports neither lark nor desert nor marshmallow. Command lines it cannot
+handle, such as ambiguous ones, ``--help`` or invalid values, are passed on to
+:mod:`clout` at runtime, which imports the full machinery and reports errors as
+usual. Regenerate the module whenever the dataclass changes.
+"""
+import importlib
+import typing as t
+
+import click
+import marshmallow
+
+from . import _util
+from ._loaders import cli
+from ._loaders import construct
+from ._loaders import parsing
+from ._loaders import schemas
+
+
+# Click types the generated code converts with a builtin, and the marshmallow
+# fields that accept the converted value as it is.
+CONVERTERS = {
+    click.STRING: ("str", marshmallow.fields.String),
+    click.INT: ("int", marshmallow.fields.Integer),
+    click.FLOAT: ("float", marshmallow.fields.Float),
+}
+
+HEADER = '''"""Load {target} from the command line.
+
+Generated by ``python -m clout.compile {target}``. Do not edit.
+"""
+import math
+import os
+import sys
+
+from clout._loaders import fastpath
+from clout._loaders.fastpath import Command, Param, Table
+
+{imports}
+
+
+APP_NAME = {app_name!r}
+TYPE = {type}
+VALUE_DECLS = frozenset({value_decls!r})
+TABLE = Table(
+    root={root!r},
+    commands={{
+{commands}
+    }},
+)
+
+
+class Fallback(Exception):
+    """Raised for command lines left to clout."""
+
+
+def finite_float(value):
+    value = float(value)
+    if not math.isfinite(value):
+        raise Fallback(value)
+    return value
+'''
+
+FOOTER = '''
+
+def load(args=None):
+    """Build ``TYPE`` from ``args``, which default to ``sys.argv[2:]``."""
+    args = sys.argv[2:] if args is None else list(args)
+    tokens = [{top_level_name!r}, {app_command!r}] + fastpath.split_option_values(
+        args, VALUE_DECLS
+    )
+    parsed = fastpath.parse(TABLE, tokens)
+    if parsed is not None:
+        _root, [(rule, items)] = parsed
+        if rule == {app_rule!r}:
+            try:
+                return {app_loader}(items)
+            except (Fallback, TypeError, ValueError):
+                pass
+    return fallback(args)
+
+
+def fallback(args):
+    import clout._loaders.cli
+
+    return clout._loaders.cli.CLI(app_name=APP_NAME, args=args).build(TYPE)
+'''
+
+
+class Unsupported(Exception):
+    """Raised for dataclasses the generated code cannot build."""
+
+
+def resolve(target: str) -> t.Type:
+    module_name, _, qualname = target.partition(":")
+    obj = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def reference(cls: t.Type, modules: t.Set[str]) -> str:
+    if "<locals>" in cls.__qualname__:
+        raise Unsupported(f"{cls.__qualname__} is not importable")
+    modules.add(cls.__module__)
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def get_converter(
+    param: click.Parameter, field: marshmallow.fields.Field
+) -> t.Optional[str]:
+    """Return the builtin converting values of ``param``, or None if there is none."""
+    if field.validators or param.multiple or param.nargs != 1 or param.callback:
+        return None
+    converter, field_type = CONVERTERS.get(param.type, (None, None))
+    if field_type is None or not isinstance(field, field_type):
+        return None
+    if converter == "float" and not field.allow_nan:
+        # Leave nan and infinity to the field, which rejects them.
+        return "finite_float"
+    return converter
+
+
+class Generator:
+    def __init__(self):
+        self.modules: t.Set[str] = set()
+        self.functions: t.List[str] = []
+        self.names: t.Dict[str, str] = {}
+
+    def loader_name(self, command: click.BaseCommand) -> str:
+        rule = parsing.name_rule(command)
+        if rule not in self.names:
+            self.names[rule] = f"_load_{len(self.names)}"
+        return self.names[rule]
+
+    def add_loader(
+        self, cls: t.Type, schema: marshmallow.Schema, command: click.BaseCommand
+    ) -> str:
+        name = self.loader_name(command)
+        params = {param.name: param for param in command.params}
+        subcommands = getattr(command, "commands", {})
+        types = construct.field_types(cls)
+        branches = []
+        envvars = []
+        for field_name, field in schema.fields.items():
+            attribute = field.attribute or field_name
+            if isinstance(field, marshmallow.fields.Nested):
+                sub = subcommands[field_name]
+                child = types.get(attribute)
+                if not construct.is_dataclass(child):
+                    raise Unsupported(f"{cls.__qualname__}.{attribute}: {child}")
+                child_loader = self.add_loader(child, field.schema, sub)
+                branches.append(
+                    (parsing.name_rule(sub), attribute, f"{child_loader}(value)")
+                )
+                continue
+
+            param = params.get(field_name)
+            if param is None:
+                continue
+            converter = get_converter(param, field)
+            if param.is_flag and isinstance(field, marshmallow.fields.Boolean):
+                expression = "True"
+            elif converter is not None:
+                expression = f"{converter}(value)"
+            else:
+                expression = None
+            branches.append((parsing.name_rule(param), attribute, expression))
+            envvar = cli.get_envvar(field)
+            if envvar is not None:
+                envvars.append((attribute, envvar, converter))
+
+        cls_reference = reference(cls, self.modules)
+        lines = [
+            f"def {name}(items):",
+            f'    """Build {cls_reference} from the {command.name} items."""',
+            "    kwargs = {}",
+            "    for rule, value in items:",
+        ]
+        for rule, attribute, expression in branches:
+            lines.append(f"        if rule == {rule!r}:")
+            if expression is None:
+                lines.append("            raise Fallback(rule)")
+            else:
+                lines.append(f"            kwargs[{attribute!r}] = {expression}")
+                lines.append("            continue")
+        lines.append("        raise Fallback(rule)")
+        for attribute, envvar, converter in envvars:
+            lines.append(f"    if {attribute!r} not in kwargs:")
+            lines.append(f"        value = os.environ.get({envvar!r})")
+            lines.append("        if value is not None:")
+            if converter is None:
+                lines.append(f"            raise Fallback({envvar!r})")
+            else:
+                lines.append(f"            kwargs[{attribute!r}] = {converter}(value)")
+        lines.append(f"    return {cls_reference}(**kwargs)")
+        self.functions.append("\n".join(lines))
+        return name
+
+
+def compile_module(target: str, app_name: t.Optional[str] = None) -> str:
+    """Return the source of a module that loads ``target`` from the command line."""
+    typ = resolve(target)
+    app_name = app_name or _util.dasherize(typ.__name__)
+    command = cli.CLI(app_name=app_name).get_command(typ)
+    table = parsing.build_table(command)
+    if table is None:
+        raise Unsupported(f"{target} has positional or variadic parameters")
+    app_command = command.commands[_util.dasherize(app_name)]
+
+    generator = Generator()
+    app_loader = generator.add_loader(typ, schemas.get_schema(typ), app_command)
+    value_decls = sorted(
+        decl
+        for cmd in parsing.get_base_commands(command)
+        for param in cmd.params
+        if isinstance(param, click.Option) and not param.is_flag
+        for decl in param.opts
+    )
+    type_reference = reference(typ, generator.modules)
+    commands = "\n".join(
+        f"        {rule!r}: {entry!r}," for rule, entry in table.commands.items()
+    )
+    header = HEADER.format(
+        target=target,
+        imports="\n".join(f"import {module}" for module in sorted(generator.modules)),
+        app_name=app_name,
+        type=type_reference,
+        value_decls=value_decls,
+        root=table.root,
+        commands=commands,
+    )
+    footer = FOOTER.format(
+        top_level_name=cli.TOP_LEVEL_NAME,
+        app_command=app_command.name,
+        app_rule=parsing.name_rule(app_command),
+        app_loader=app_loader,
+    )
+    return "\n\n\n".join([header] + generator.functions) + "\n" + footer
+
+
+@click.command()
+@click.argument("target")
+@click.option("--app-name", help="Command name, by default the dasherized class name.")
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w"),
+    default="-",
+    help="File to write the module to, by default stdout.",
+)
+def main(target, app_name, output):
+    """Generate a module loading TARGET, given as module:QualifiedName."""
+    try:
+        source = compile_module(target, app_name)
+    except Unsupported as e:
+        raise click.ClickException(str(e)) from e
+    output.write(source)
+
+
+if __name__ == "__main__":
+    main()  # pylint: disable=no-value-for-parameter
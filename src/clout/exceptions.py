@@ -13,10 +13,40 @@ class ValidationError(CloutException):
 class MissingInput(CloutException):
     """Raised for missing command-line arguments."""
 
-    def __init__(self, group, string, found):
+    def __init__(self, group, string, found, expected=()):
         self.group = group
         self.string = string
         self.found = found
+        self.expected = expected
 
     def __str__(self):
+        if self.expected:
+            return f"Parsing fails at {self.found}, expected one of {self.expected}"
         return f"Parsing fails at {self.found}"
+
+
+class LoaderTimeout(CloutException):
+    """Raised when a loader takes longer than its timeout."""
+
+    def __init__(self, loader, timeout):
+        self.loader = loader
+        self.timeout = timeout
+
+    def __str__(self):
+        return f"{self.loader!r} did not finish within {self.timeout} seconds"
+
+
+class InvalidFile(CloutException):
+    """Raised when a config file, or a section of it, does not hold a mapping."""
+
+    def __init__(self, path, data, section=None):
+        self.path = path
+        self.data = data
+        self.section = section
+
+    def __str__(self):
+        where = str(self.path)
+        if self.section is not None:
+            where = f"section {self.section!r} of {where}"
+        found = type(self.data).__name__
+        return f"Expected a mapping in {where}, found {found}"
@@ -0,0 +1,21 @@
+"""Dataclasses for the tests of :mod:`clout.compile`, importing nothing else."""
+import attr
+
+
+@attr.dataclass
+class User:
+    name: str
+
+
+@attr.dataclass
+class DB:
+    host: str = attr.ib(metadata={"clout": {"cli": dict(envvar="APP_DB_HOST")}})
+    port: int = 5432
+    user: User = attr.ib(factory=lambda: User("admin"))
+
+
+@attr.dataclass
+class App:
+    db: DB
+    debug: bool = False
+    ratio: float = 0.5
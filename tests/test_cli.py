@@ -1,6 +1,13 @@
 import os
 import subprocess
 import sys
+import typing as t
+
+import attr
+
+import clout
+import clout._loaders.cli
+import clout._loaders.multi
 
 
 def test_long_example():
@@ -80,3 +87,145 @@ def test_envvar():
         env={"EXAMPLE_NAME": "Alice"},
     )
     assert proc.stdout.decode() == "Hello, Alice!\n"
+
+
+def test_show_missing_subcommand_args():
+    """Show help for a subcommand with no arguments, or an option with no value."""
+    for args in [["db"], ["db", "--host"]]:
+        proc = subprocess.run(
+            [sys.executable, "docs/short.py"] + args,
+            capture_output=True,
+            check=False,
+            timeout=60,
+        )
+        assert proc.returncode == 0, proc.stderr.decode()
+        assert "--port" in proc.stdout.decode()
+
+
+def test_command_tree_built_once(monkeypatch):
+    """Repeated builds reuse the command tree until an ``envvar`` default changes."""
+
+    @attr.dataclass
+    class Person:
+        name: str = attr.ib(metadata={"clout": {"cli": dict(envvar="PERSON_NAME")}})
+        age: int
+
+    calls = []
+    make_command = clout._loaders.cli.CLI.make_command_from_schema
+    monkeypatch.setattr(
+        clout._loaders.cli.CLI,
+        "make_command_from_schema",
+        lambda *a, **kw: calls.append(a) or make_command(*a, **kw),
+    )
+    monkeypatch.setenv("PERSON_NAME", "Alice")
+    cli = clout._loaders.cli.CLI(app_name="person", args=["--age", "21"])
+
+    assert cli.build(Person) == Person("Alice", 21)
+    assert cli.build(Person) == Person("Alice", 21)
+    assert len(calls) == 1
+
+    monkeypatch.setenv("PERSON_NAME", "Bob")
+    assert cli.build(Person) == Person("Bob", 21)
+    assert len(calls) == 2
+
+
+def test_defaults_show_their_source():
+    """With show_default_sources, the help names the layer each default comes from."""
+
+    @attr.dataclass
+    class DB:
+        host: str = "localhost"
+        port: int = 5432
+
+    @attr.dataclass
+    class App:
+        db: DB
+        debug: bool = False
+
+    default_map = clout._loaders.multi.DeepChainMap(
+        {"db": {"port": 6543}}, {"db": {"host": "example.com", "port": 1}}
+    )
+    cli = clout._loaders.cli.CLI(
+        app_name="app",
+        context_settings={"default_map": default_map},
+        show_default_sources=True,
+        default_sources=["$APP_DB_PORT", "config.toml"],
+    )
+    command = cli.get_command(App)
+    db = command.commands["app"].commands["db"]
+    params = {param.name: param for param in db.params}
+
+    assert params["host"].default == "example.com"
+    assert params["host"].show_default == "example.com from config.toml"
+    assert params["port"].default == 6543
+    assert params["port"].show_default == "6543 from $APP_DB_PORT"
+    built = cli.set(args=["db", "--port", "7"]).build(App)
+    assert built == App(DB("example.com", 7))
+
+
+def test_default_help_hides_sources():
+    """Without show_default_sources, the help shows defaults as click does."""
+    proc = subprocess.run(
+        [sys.executable, "examples/long.py", "config", "--help"],
+        capture_output=True,
+        check=False,
+    )
+    output = proc.stdout.decode()
+
+    assert "--dry-run / --no-dry-run  [default: True]" in output
+    assert " from " not in output
+
+
+def test_dict_default_of_any_field():
+    """A mapping in the default map is the default of a field that is not nested."""
+
+    @attr.dataclass
+    class App:
+        name: str = "x"
+        extra: t.Any = None
+
+    cli = clout._loaders.cli.CLI(
+        app_name="app",
+        context_settings={"default_map": {"extra": {"a": 1}}},
+        args=["--name", "y"],
+    )
+
+    assert cli.build(App) == App("y", {"a": 1})
+
+
+def test_timing_hook():
+    """A timing hook receives the time spent in each phase of a build."""
+
+    @attr.dataclass
+    class Server:
+        host: str
+        port: int
+
+    reports = []
+    clout.add_timing_hook(reports.append)
+    try:
+        args = ["--host", "a", "--port", "1"]
+        cli = clout._loaders.cli.CLI(app_name="server", args=args)
+        assert cli.build(Server) == Server("a", 1)
+    finally:
+        clout.remove_timing_hook(reports.append)
+
+    [timings] = reports
+    assert {"command_tree", "transform", "schema_load"} <= set(timings.phases)
+    assert timings.total >= sum(timings.phases.values())
+    assert timings.summary().startswith("clout timings: total=")
+
+
+def test_show_timings():
+    """CLI_SHOW_TIMINGS prints a one-line summary to stderr."""
+    args = ["--dry-run", "db", "--host", "example.com", "--port", "9999"]
+    proc = subprocess.run(
+        [sys.executable, "docs/short.py"] + args,
+        capture_output=True,
+        check=False,
+        env=dict(os.environ, CLI_SHOW_TIMINGS="1"),
+    )
+    assert proc.returncode == 0, proc.stderr.decode()
+
+    [line] = proc.stderr.decode().splitlines()
+    assert line.startswith("clout timings: total=")
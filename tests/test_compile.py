@@ -0,0 +1,125 @@
+import importlib.util
+import subprocess
+import sys
+
+import pytest
+
+import clout._loaders.cli
+import clout.compile
+import clout.exceptions
+from tests.examples import compiled_types
+
+
+TARGET = "tests.examples.compiled_types:App"
+
+
+def import_compiled(tmp_path, app_name=None):
+    path = tmp_path / "app_cli.py"
+    path.write_text(clout.compile.compile_module(TARGET, app_name))
+    spec = importlib.util.spec_from_file_location("app_cli", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(name="compiled")
+def _compiled(tmp_path):
+    return import_compiled(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["db", "--host", "a"],
+        ["--debug", "--ratio", "2", "db", "--host=a", "--port", "1"],
+        ["db", "--host", "a", "user", "--name", "bob"],
+    ],
+)
+def test_compiled_module_matches_cli(compiled, args, monkeypatch):
+    """The generated loader builds the same object as clout does at runtime."""
+    monkeypatch.setattr(compiled, "fallback", None)
+    expected = clout._loaders.cli.CLI(app_name="app", args=args).build(
+        compiled_types.App
+    )
+
+    assert compiled.load(args) == expected
+
+
+def test_compiled_module_falls_back(compiled, monkeypatch):
+    """Command lines the table cannot build are left to clout."""
+    calls = []
+    monkeypatch.setattr(compiled, "fallback", calls.append)
+    argvs = [
+        ["db", "--host", "a", "--port", "x"],
+        ["db", "--host", "a", "user"],
+        ["--ratio", "nan", "db", "--host", "a"],
+        ["--ratio", "inf", "db", "--host", "a"],
+        ["--ratio", "-inf", "db", "--host", "a"],
+    ]
+
+    for args in argvs:
+        compiled.load(args)
+    assert calls == argvs
+
+
+@pytest.mark.parametrize("ratio", ["nan", "inf"])
+def test_compiled_module_rejects_special_floats(compiled, ratio):
+    """Like the runtime loader, the generated one refuses nan and infinity."""
+    args = ["--ratio", ratio, "db", "--host", "a"]
+
+    with pytest.raises(clout.exceptions.ValidationError) as info:
+        compiled.load(args)
+    assert "Special numeric values" in str(info.value)
+
+
+def test_compiled_module_reads_envvars(compiled, monkeypatch):
+    """Defaults from ``envvar`` metadata are read when the module loads."""
+    monkeypatch.setattr(compiled, "fallback", None)
+    monkeypatch.setenv("APP_DB_HOST", "from-env")
+
+    assert compiled.load(["db", "--port", "1"]).db.host == "from-env"
+    assert compiled.load(["db", "--host", "a"]).db.host == "a"
+
+
+def test_compiled_module_reads_argv_only_without_args(compiled, monkeypatch):
+    """Like the CLI loader, ``load()`` reads sys.argv[2:] and ``load([])`` does not."""
+    monkeypatch.setattr(sys, "argv", ["prog", "app", "db", "--host", "from-argv"])
+
+    assert compiled.load().db.host == "from-argv"
+    with pytest.raises(SystemExit):
+        compiled.load([])
+
+
+def test_compiled_module_with_underscored_app_name(tmp_path, monkeypatch):
+    """The app name is dasherized, in the table and when falling back."""
+    compiled = import_compiled(tmp_path, "my_app")
+    fallback = compiled.fallback
+
+    monkeypatch.setattr(compiled, "fallback", None)
+    assert compiled.load(["db", "--host", "a"]).db.host == "a"
+    monkeypatch.setattr(compiled, "fallback", fallback)
+    with pytest.raises(clout.exceptions.ValidationError):
+        compiled.load(["--ratio", "nan", "db", "--host", "a"])
+
+
+def test_compiled_module_imports(tmp_path):
+    """Loading through the generated module imports none of clout's dependencies."""
+    path = tmp_path / "app_cli.py"
+    subprocess.run(
+        [sys.executable, "-m", "clout.compile", TARGET, "-o", str(path)], check=True
+    )
+    code = (
+        "import sys, app_cli;"
+        "print(app_cli.load(['db', '--host', 'a']));"
+        "print(' '.join(sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        env={"PYTHONPATH": f"{tmp_path}:."},
+    )
+    value, modules = proc.stdout.decode().splitlines()
+
+    assert value == repr(compiled_types.App(compiled_types.DB("a")))
+    assert not {"lark", "desert", "marshmallow", "click", "glom"} & set(modules.split())
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+
+import attr
+
+import clout
+import clout._loaders.completion
+
+
+@attr.dataclass
+class DB:
+    host: str
+
+
+@attr.dataclass
+class App:
+    db: DB
+    debug: bool = False
+
+
+def make_table():
+    command = clout.Command(App, name="app").make_app_command()
+    return clout._loaders.completion.make_table(command)
+
+
+def test_complete_options_and_subcommands():
+    """Completions include the options of the current command and its parents."""
+    table = make_table()
+    complete = clout._loaders.completion.complete
+
+    assert complete(table, [], "") == [("db", ""), ("--debug", "")]
+    assert complete(table, ["db"], "--") == [("--host", ""), ("--debug", "")]
+    assert complete(table, ["db", "--host"], "") == []
+    assert complete(table, ["db", "--host", "a", "--debug"], "d") == [("db", "")]
+
+
+def test_table_is_saved(tmp_path, monkeypatch):
+    """The table is built once and read back until a dataclass file changes."""
+    monkeypatch.setenv("CLOUT_CACHE_DIR", str(tmp_path))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return clout.Command(App, name="app").make_app_command()
+
+    first = clout._loaders.completion.get_table(App, "app", build)
+    second = clout._loaders.completion.get_table(App, "app", build)
+
+    assert first == second
+    assert len(builds) == 1
+    [path] = tmp_path.glob("completion-*.json")
+    assert __file__ in path.read_text()
+
+
+def test_complete_without_parser_imports(tmp_path):
+    """Completing from a saved table imports neither lark nor marshmallow."""
+    env = dict(
+        os.environ,
+        CLOUT_CACHE_DIR=str(tmp_path),
+        COMP_WORDS="decorator.py --",
+        COMP_CWORD="1",
+        **{"_DECORATOR.PY_COMPLETE": "complete"},
+    )
+    command = [sys.executable, "-X", "importtime", "examples/decorator.py"]
+    subprocess.run(command, env=env, capture_output=True, check=False)
+    proc = subprocess.run(command, env=env, capture_output=True, check=False)
+
+    assert sorted(proc.stdout.decode().split()) == ["--age", "--name"]
+    lines = proc.stderr.decode().splitlines()
+    imported = {line.split("|")[-1].strip() for line in lines}
+    assert not imported & {"lark", "marshmallow", "desert"}
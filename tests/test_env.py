@@ -0,0 +1,44 @@
+import attr
+
+import clout._loaders.env
+
+
+@attr.dataclass
+class DB:
+    host: str
+    port: int
+
+
+@attr.dataclass
+class Config:
+    db: DB
+    debug: bool
+
+
+@attr.dataclass
+class Worker:
+    threads: int
+
+
+def test_prep_many_scans_environment_once():
+    """Several dataclasses are loaded from one pass over the environment."""
+    env = clout._loaders.env.Env(prefix="myapp")
+    environ = {
+        "MYAPP_DB_HOST": "example.com",
+        "MYAPP_DB_PORT": "9999",
+        "MYAPP_THREADS": "4",
+        "OTHER_THREADS": "8",
+    }
+
+    config, worker = env.prep_many([Config, Worker], env=environ)
+
+    assert config == {"db": {"host": "example.com", "port": 9999}}
+    assert worker == {"threads": 4}
+    assert env.get_index(Config) is env.get_index(Config)
+
+
+def test_make_nested_from_tuple_paths():
+    """Nesting works on tuple paths from any iterable, so keys may contain dots."""
+    pairs = iter([(("a", "b.c"), 1), (("a", "d"), 2), (("e",), 3)])
+
+    assert clout._loaders.env.make_nested(pairs) == {"a": {"b.c": 1, "d": 2}, "e": 3}
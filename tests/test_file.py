@@ -0,0 +1,108 @@
+import json
+
+import attr
+import pytest
+
+import clout
+import clout._loaders.file
+import clout._loaders.multi
+import clout.exceptions
+
+
+@attr.dataclass(frozen=True)
+class DB:
+    host: str
+    port: int = 5432
+
+
+@attr.dataclass(frozen=True)
+class Config:
+    db: DB
+    debug: bool = False
+
+
+@pytest.mark.parametrize(
+    "name,text",
+    [
+        ("config.json", json.dumps({"debug": True, "db": {"host": "a", "x": 1}})),
+        ("config.toml", "debug = true\n[db]\nhost = 'a'\nx = 1\n"),
+        ("config.yaml", "debug: true\ndb:\n  host: a\n  x: 1\n"),
+        ("config.ini", "[DEFAULT]\ndebug = true\n[db]\nhost = a\nx = 1\n"),
+    ],
+)
+def test_formats(tmp_path, name, text):
+    """Each format loads, keeping only the keys the schema has fields for."""
+    path = tmp_path / name
+    path.write_text(text)
+
+    loaded = clout.load_file(Config, path)
+
+    assert set(loaded) == {"debug", "db"}
+    assert loaded["db"] == {"host": "a"}
+    assert clout._loaders.multi.Multi([clout._loaders.file.File(path)]).build(
+        Config
+    ) == Config(DB("a"), debug=True)
+
+
+def test_reparse_only_changed_files(tmp_path, monkeypatch):
+    """The parsed file is reused until its mtime, size or inode changes."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"db": {"host": "a"}}))
+    calls = []
+    read_json = clout._loaders.file.read_json
+    monkeypatch.setitem(
+        clout._loaders.file.READERS,
+        "json",
+        lambda text: calls.append(text) or read_json(text),
+    )
+    loader = clout._loaders.file.File(path)
+
+    assert loader.prep(Config) == loader.prep(Config) == {"db": {"host": "a"}}
+    assert len(calls) == 1
+
+    path.write_text(json.dumps({"db": {"host": "bb"}}))
+    assert loader.prep(Config) == {"db": {"host": "bb"}}
+    assert len(calls) == 2
+
+
+def test_changing_a_read_file_keeps_the_cache(tmp_path):
+    """Changing the data read from a file does not change the next read."""
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"db": {"host": "a"}}))
+
+    data = clout._loaders.file.read_file(path)
+    data["db"]["host"] = "changed"
+
+    assert clout._loaders.file.read_file(path) == {"db": {"host": "a"}}
+
+
+@pytest.mark.parametrize(
+    "name,text", [("config.json", "null"), ("config.yaml", "- a\n- b\n")]
+)
+def test_file_without_a_mapping(tmp_path, name, text):
+    """A file that does not hold a mapping raises an error naming it."""
+    path = tmp_path / name
+    path.write_text(text)
+
+    with pytest.raises(clout.exceptions.InvalidFile) as info:
+        clout.load_file(Config, path)
+    assert str(path) in str(info.value)
+
+
+def test_parsed_files_are_bounded(tmp_path, monkeypatch):
+    """Only the most recently read files are kept parsed."""
+    monkeypatch.setattr(clout._loaders.file, "MAX_PARSED_FILES", 2)
+    clout._loaders.file.clear_file_cache()
+    paths = [tmp_path / f"config{i}.json" for i in range(3)]
+    for path in paths:
+        path.write_text("{}")
+        clout._loaders.file.read_file(path)
+
+    assert [key[0] for key in clout._loaders.file._PARSED] == [
+        str(path) for path in paths[1:]
+    ]
+
+
+def test_missing_file(tmp_path):
+    """A missing file loads nothing."""
+    assert clout._loaders.file.File(tmp_path / "config.toml").prep(Config) == {}
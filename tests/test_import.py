@@ -0,0 +1,42 @@
+import subprocess
+import sys
+
+
+# Cumulative microseconds reported by ``python -X importtime`` for ``clout``.
+IMPORT_TIME_BUDGET_US = 20_000
+
+HEAVY_MODULES = [
+    "black",
+    "click",
+    "desert",
+    "glom",
+    "inflection",
+    "lark",
+    "marshmallow",
+    "typing_inspect",
+]
+
+
+def test_import_time_budget():
+    """``import clout`` defers its dependencies and stays within its time budget."""
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import sys, clout; print(' '.join(sys.modules))",
+        ],
+        capture_output=True,
+        check=True,
+    )
+
+    modules = set(proc.stdout.decode().split())
+    assert not modules & set(HEAVY_MODULES)
+
+    [cumulative] = [
+        int(line.split("|")[1])
+        for line in proc.stderr.decode().splitlines()
+        if line.startswith("import time:") and line.split("|")[2].strip() == "clout"
+    ]
+    assert cumulative < IMPORT_TIME_BUDGET_US
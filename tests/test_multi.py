@@ -1,6 +1,17 @@
+import asyncio
+import collections
+import threading
+import time
+
 import attr
+import pytest
 
+import clout
+import clout._loaders.cli
+import clout._loaders.env
+import clout._loaders.file
 import clout._loaders.multi
+import clout.exceptions
 
 
 def test_deep_chainmap():
@@ -27,3 +38,199 @@ def test_defaults():
     built = clout._loaders.multi.Multi([]).build(Config)
 
     assert built == Config(DB("example.com", 12345), True, False)
+
+
+def test_deep_chainmap_caches_views():
+    """Nested views are reused until the chain map is written to or invalidated."""
+    a, b = {"a": {"b": 1}}, {"a": {"c": 2}}
+    dcm = clout._loaders.multi.DeepChainMap(a, b)
+    view = dcm["a"]
+    assert dcm["a"] is view
+
+    dcm["a"] = {"b": 3}
+    assert dcm["a"] is not view
+    assert dict(dcm["a"]) == {"b": 3, "c": 2}
+
+    b["z"] = 5
+    dcm.invalidate()
+    assert "z" in dcm
+    assert dcm["z"] == 5
+    assert dcm.flatten() == {("a", "b"): 3, ("a", "c"): 2, ("z",): 5}
+
+
+def test_deep_chainmap_writes_through_views():
+    """Writing to a nested view changes the layer and refreshes its parents."""
+    dcm = clout._loaders.multi.DeepChainMap({"a": {"b": 1}}, {"a": {"c": 2}})
+    assert dcm.flatten() == {("a", "b"): 1, ("a", "c"): 2}
+    dcm["a"]["c"] = 3
+    assert dcm.flatten() == {("a", "b"): 1, ("a", "c"): 3}
+    assert dcm.maps[0] == {"a": {"b": 1, "c": 3}}
+
+
+def test_deep_chainmap_materializes_like_lookups():
+    """to_dict, flatten and sources agree with lookups, even where maps disagree."""
+    maps = [
+        {"a": {"b": 1}, "x": 1},
+        {"a": {"b": 2, "c": 2}, "x": {"y": 2}, "z": 2},
+        {"a": 3, "z": {"w": 3}},
+    ]
+    dcm = clout._loaders.multi.DeepChainMap(*maps)
+
+    assert dcm.to_dict() == {"a": {"b": 1, "c": 2}, "x": 1, "z": 2}
+    assert dcm.flatten() == {("a", "b"): 1, ("a", "c"): 2, ("x",): 1, ("z",): 2}
+    assert dcm.sources() == {("a", "b"): 0, ("a", "c"): 1, ("x",): 0, ("z",): 1}
+    assert dict(dcm["a"]) == {"b": 1, "c": 2}
+    assert list(dcm) == list(collections.ChainMap(*maps))
+
+
+@attr.dataclass(frozen=True)
+class SlowLoader:
+    """A loader that returns ``data`` after ``seconds``."""
+
+    data: dict
+    seconds: float = 0.0
+    inherits: frozenset = frozenset()
+
+    def set(self, **kw):
+        return attr.evolve(self, **kw)
+
+    def prep(self, cls):
+        time.sleep(self.seconds)
+        return self.data
+
+
+@attr.dataclass(frozen=True)
+class MeetingLoader:
+    """A loader that returns ``data`` once all loaders sharing ``barrier`` run."""
+
+    data: dict
+    barrier: threading.Barrier
+    inherits: frozenset = frozenset()
+
+    def set(self, **kw):
+        return attr.evolve(self, **kw)
+
+    def prep(self, cls):
+        self.barrier.wait(timeout=10)
+        return self.data
+
+
+def test_concurrent_loaders():
+    """Concurrent loaders run together and keep their precedence."""
+    barrier = threading.Barrier(2)
+    loaders = [
+        MeetingLoader({"a": 1}, barrier),
+        MeetingLoader({"a": 2, "b": 2}, barrier),
+    ]
+    multi = clout._loaders.multi.Multi(loaders, concurrent=True)
+
+    results = multi.run_loaders(dict)
+
+    assert [result.loader for result in results] == loaders
+    assert multi.prep(dict).to_dict() == {"a": 1, "b": 2}
+
+
+def test_concurrent_loader_timeout():
+    """A loader that runs over the timeout raises LoaderTimeout."""
+    loaders = [SlowLoader({"a": 1}), SlowLoader({"b": 2}, 1.0)]
+    multi = clout._loaders.multi.Multi(loaders, concurrent=True, timeout=0.1)
+
+    with pytest.raises(clout.exceptions.LoaderTimeout) as info:
+        multi.prep(dict)
+    assert info.value.loader == loaders[1]
+
+
+def test_queued_loaders_get_their_own_timeout():
+    """The timeout of a loader starts when it starts, not when it is queued."""
+    loaders = [SlowLoader({"a": 1}, 0.6), SlowLoader({"b": 2}, 0.6)]
+    multi = clout._loaders.multi.Multi(
+        loaders, concurrent=True, max_workers=1, timeout=1.0
+    )
+
+    assert multi.prep(dict).to_dict() == {"a": 1, "b": 2}
+
+
+@attr.dataclass(frozen=True)
+class AsyncMeetingLoader(MeetingLoader):
+    def prep(self, cls):
+        raise AssertionError("aprep is awaited instead")
+
+    async def aprep(self, cls):
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.barrier.wait, 10
+        )
+        return self.data
+
+
+def test_abuild():
+    """Async and sync loaders are awaited together."""
+
+    @attr.dataclass(frozen=True)
+    class Config:
+        a: int
+        b: int
+
+    barrier = threading.Barrier(2)
+    loaders = [
+        AsyncMeetingLoader({"a": 1}, barrier),
+        MeetingLoader({"a": 2, "b": 2}, barrier),
+    ]
+    multi = clout._loaders.multi.Multi(loaders)
+
+    assert asyncio.run(multi.abuild(Config)) == Config(1, 2)
+
+
+def test_raw_values_are_converted_once(tmp_path, monkeypatch):
+    """In raw mode only the value that takes precedence is converted."""
+
+    @attr.dataclass(frozen=True)
+    class DB:
+        host: str
+        port: int
+
+    @attr.dataclass(frozen=True)
+    class Config:
+        db: DB
+        debug: bool = False
+
+    path = tmp_path / "config.json"
+    path.write_text('{"db": {"host": "file.example.com", "port": 5432}}')
+    monkeypatch.setenv("APP_DB_PORT", "not a number")
+    monkeypatch.setenv("APP_DEBUG", "yes")
+    multi = clout._loaders.multi.Multi(
+        [
+            clout._loaders.cli.CLI(args=["db", "--port", "1234"]),
+            clout._loaders.env.Env(prefix="APP"),
+            clout._loaders.file.File(path),
+        ],
+        data={"app_name": "config", "raw": True},
+    )
+
+    prepped = multi.prep(Config)
+    assert prepped["db"]["port"] == clout.RawValue("1234", "--port")
+    assert prepped["db"]["host"] == clout.RawValue("file.example.com", str(path))
+    assert prepped["debug"] == clout.RawValue("yes", "$APP_DEBUG")
+    assert multi.build(Config) == Config(DB("file.example.com", 1234), True)
+
+
+def test_raw_cli_keeps_its_default_map():
+    """In raw mode the command line gives the defaults of its default map."""
+
+    @attr.dataclass(frozen=True)
+    class DB:
+        host: str
+        port: int
+
+    @attr.dataclass(frozen=True)
+    class App:
+        db: DB
+
+    cli = clout._loaders.cli.CLI(
+        app_name="app",
+        raw=True,
+        context_settings={"default_map": {"db": {"host": "x"}}},
+        args=["db", "--port", "2"],
+    )
+
+    assert cli.prep(App)["db"]["host"] == clout.RawValue("x", "default_map")
+    assert cli.build(App) == App(DB("x", 2))
@@ -0,0 +1,440 @@
+import collections
+import concurrent.futures
+import os
+import subprocess
+import sys
+
+import attr
+import click
+import lark
+import pytest
+
+import clout._loaders.cli
+import clout._loaders.parsing
+import clout.exceptions
+
+
+@attr.dataclass
+class User:
+    name: str
+
+
+@attr.dataclass
+class DB:
+    host: str
+    port: int
+
+
+@attr.dataclass
+class Config:
+    db: DB
+    dry_run: bool
+
+
+@attr.dataclass
+class NestedDB:
+    host: str
+    user: User
+
+
+@attr.dataclass
+class NestedConfig:
+    db: NestedDB
+    user: User
+
+
+def make_parser(cache, typ=Config):
+    cli = clout._loaders.cli.CLI(app_name="config")
+    command = cli.get_command(typ)
+    return clout._loaders.parsing.Parser(command, cache=cache)
+
+
+ARGS = [
+    clout._loaders.cli.TOP_LEVEL_NAME,
+    "config",
+    "--dry-run",
+    "db",
+    "--host",
+    "example.com",
+    "--port",
+    "9999",
+]
+
+
+def test_parser_cache_reuses_parser_for_same_structure():
+    """A second parse against a freshly built, identical command tree hits the cache."""
+    cache = clout._loaders.parsing.ParserCache()
+
+    first = make_parser(cache).parse_earley(ARGS)
+    second = make_parser(cache).parse_earley(ARGS)
+
+    assert first == second
+    assert second["config"]["db"] == {"host": "example.com", "port": 9999}
+    assert cache.cache_info() == clout._loaders.parsing.CacheInfo(
+        hits=1, misses=1, disk_hits=0, currsize=1
+    )
+
+
+def test_parser_cache_loads_parser_from_disk(tmp_path):
+    """A new cache sharing a directory loads the pickled parser instead of building it."""
+    make_parser(
+        clout._loaders.parsing.ParserCache(directory=str(tmp_path))
+    ).parse_earley(ARGS)
+    assert len(list(tmp_path.glob("parser-*.pickle"))) == 1
+
+    cache = clout._loaders.parsing.ParserCache(directory=str(tmp_path))
+    value = make_parser(cache).parse_earley(ARGS)
+
+    assert value["config"]["db"] == {"host": "example.com", "port": 9999}
+    assert cache.cache_info().disk_hits == 1
+
+
+BUILD_IN_PROCESS = """
+import sys
+import clout._loaders.cli
+import clout._loaders.parsing
+import test_parsing
+
+cache = clout._loaders.parsing.ParserCache(directory=sys.argv[1])
+cache.get(clout._loaders.cli.CLI(app_name="config").get_command(test_parsing.Config))
+print(cache.cache_info().disk_hits)
+"""
+
+
+def test_parser_cache_hits_across_hash_seeds(tmp_path):
+    """The grammar does not depend on string hashing, so other processes reuse it."""
+
+    def build(seed):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        env["PYTHONPATH"] = os.pathsep.join([os.path.dirname(__file__)] + sys.path)
+        return subprocess.run(
+            [sys.executable, "-c", BUILD_IN_PROCESS, str(tmp_path)],
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+
+    assert build("1") == "0"
+    assert build("2") == "1"
+    assert len(list(tmp_path.glob("parser-*.pickle"))) == 1
+
+
+def test_parser_cache_skips_shared_directories(tmp_path):
+    """Pickles in directories other users can write are not loaded or written."""
+    make_parser(
+        clout._loaders.parsing.ParserCache(directory=str(tmp_path))
+    ).parse_earley(ARGS)
+    tmp_path.chmod(0o777)
+
+    cache = clout._loaders.parsing.ParserCache(directory=str(tmp_path))
+    make_parser(cache).parse_earley(ARGS)
+    assert cache.cache_info().disk_hits == 0
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    make_parser(
+        clout._loaders.parsing.ParserCache(directory=str(shared))
+    ).parse_earley(ARGS)
+    assert not list(shared.iterdir())
+
+
+def test_parser_cache_keeps_recent_files(tmp_path):
+    """Only the most recently used pickles are kept on disk."""
+    for typ in [Config, NestedConfig, User]:
+        cache = clout._loaders.parsing.ParserCache(directory=str(tmp_path), max_files=2)
+        command = clout._loaders.cli.CLI(app_name="config").get_command(typ)
+        cache.get(command)
+
+    assert len(list(tmp_path.glob("parser-*.pickle"))) == 2
+
+
+def test_fast_path_skips_earley_parser():
+    """Unambiguous argv is parsed without building an Earley parser."""
+    cache = clout._loaders.parsing.ParserCache()
+    parser = make_parser(cache)
+
+    assert parser.parse_args(ARGS) == parser.parse_earley(ARGS)
+    assert cache.cache_info().misses == 1
+    assert cache.cache_info().hits == 0
+
+
+def test_fast_path_falls_back_for_ambiguous_args():
+    """A subcommand name that exists at two levels is resolved by the Earley parser."""
+    cache = clout._loaders.parsing.ParserCache()
+    value = make_parser(cache, NestedConfig).parse_args(AMBIGUOUS_ARGS)
+
+    assert value["config"]["user"] == {"name": "Alice"}
+    assert value["config"]["db"]["user"] == {"name": "Bob"}
+    assert cache.cache_info().misses == 1
+
+
+AMBIGUOUS_ARGS = [
+    clout._loaders.cli.TOP_LEVEL_NAME,
+    "config",
+    "user",
+    "--name",
+    "Alice",
+    "db",
+    "--host",
+    "example.com",
+    "user",
+    "--name",
+    "Bob",
+]
+
+
+class ReferenceWalker(lark.Visitor):
+    """The validity check the Validator replaced, to compare against."""
+
+    def __init__(self, group):
+        super().__init__()
+        for cmd in clout._loaders.parsing.get_base_commands(group):
+            setattr(self, clout._loaders.parsing.name_rule(cmd), self.make_check(cmd))
+
+    @staticmethod
+    def make_check(command):
+        def check(parsed_command):
+            counter = collections.Counter(p.data for p in parsed_command.children)
+            for child in list(command.params) + list(
+                getattr(command, "commands", {}).values()
+            ):
+                observed = counter.get(clout._loaders.parsing.name_rule(child), 0)
+                if observed > child.nargs:
+                    raise clout._loaders.parsing.TooManyArgs(child)
+
+        return check
+
+    def is_valid(self, tree):
+        try:
+            self.visit(tree)
+        except clout._loaders.parsing.TooManyArgs:
+            return False
+        return True
+
+
+def parse_ambiguous(typ, args):
+    cache = clout._loaders.parsing.ParserCache()
+    parser = make_parser(cache, typ)
+    _grammar, lark_parser = cache.get(parser.group)
+    tokens = clout._loaders.parsing.split_option_values(args, parser._value_decls)
+    return parser.group, lark_parser.parse(tokens)
+
+
+def test_validator_matches_previous_walker():
+    """Alternatives of an ambiguous parse are accepted as the old walker did."""
+    group, tree = parse_ambiguous(NestedConfig, AMBIGUOUS_ARGS)
+    validator = clout._loaders.parsing.Validator(group)
+    walker = ReferenceWalker(group)
+
+    alternatives = [alt for ambig in tree.find_data("_ambig") for alt in ambig.children]
+    validity = [validator.is_valid(alt, {}) for alt in alternatives]
+
+    assert validity == [walker.is_valid(alt) for alt in alternatives]
+    assert True in validity and False in validity
+
+
+def test_validator_rejects_too_many_args():
+    """A command given one of its children more than nargs times is invalid."""
+    cli = clout._loaders.cli.CLI(app_name="config")
+    group = cli.get_command(Config)
+    db = group.commands["config"].commands["db"]
+    [host] = [param for param in db.params if param.name == "host"]
+    rule = clout._loaders.parsing.name_rule
+    validator = clout._loaders.parsing.Validator(group)
+    walker = ReferenceWalker(group)
+
+    once = lark.Tree(rule(db), [lark.Tree(rule(host), ["a"])])
+    twice = lark.Tree(
+        rule(db), [lark.Tree(rule(host), ["a"]), lark.Tree(rule(host), ["b"])]
+    )
+
+    assert validator.is_valid(once, {}) and walker.is_valid(once)
+    assert not validator.is_valid(twice, {}) and not walker.is_valid(twice)
+
+
+def test_validator_keeps_variadic_commands_invalid():
+    """As before, a command with a nargs=-1 child never validates."""
+    run = clout._loaders.parsing.CountingCommand(
+        "run", params=[click.Argument(["files"], nargs=-1)]
+    )
+    command = clout._loaders.parsing.CountingGroup(
+        name=clout._loaders.cli.TOP_LEVEL_NAME, commands={"run": run}
+    )
+    clout._loaders.parsing.assign_rule_names(command)
+    tree = lark.Tree(clout._loaders.parsing.name_rule(command.commands["run"]), [])
+
+    assert not clout._loaders.parsing.Validator(command).is_valid(tree, {})
+    assert not ReferenceWalker(command).is_valid(tree)
+
+
+def test_shared_subtrees_are_checked_once(monkeypatch):
+    """Subtrees shared by alternatives are validated once per parse."""
+    cli = clout._loaders.cli.CLI(app_name="config")
+    group = cli.get_command(NestedConfig)
+    config = group.commands["config"]
+    user, db = config.commands["user"], config.commands["db"]
+    rule = clout._loaders.parsing.name_rule
+
+    def make_user(command, name):
+        return lark.Tree(rule(command), [lark.Tree(rule(command.params[0]), [name])])
+
+    shared = make_user(user, "Alice")
+    host = lark.Tree(rule(db.params[0]), ["example.com"])
+    valid = lark.Tree(
+        rule(config),
+        [shared, lark.Tree(rule(db), [host, make_user(db.commands["user"], "Bob")])],
+    )
+    invalid = lark.Tree(
+        rule(config), [shared, lark.Tree(rule(db), [host]), make_user(user, "Bob")]
+    )
+    tree = lark.Tree(rule(group), [lark.Tree("_ambig", [invalid, valid])])
+
+    checked = []
+    is_valid_node = clout._loaders.parsing.Validator.is_valid_node
+
+    def counting_is_valid_node(self, node):
+        checked.append(node)
+        return is_valid_node(self, node)
+
+    monkeypatch.setattr(
+        clout._loaders.parsing.Validator, "is_valid_node", counting_is_valid_node
+    )
+    result = clout._loaders.parsing.RemoveInvalidBranches(group=group).transform(tree)
+
+    assert result == lark.Tree(rule(group), [valid])
+    assert len({id(node) for node in checked}) == len(checked)
+    assert sum(node == shared for node in checked) == 1
+
+
+def test_values_are_single_arguments():
+    """Each argv element is one token, so values may contain spaces or look like options."""
+    parser = make_parser(clout._loaders.parsing.ParserCache())
+
+    for host in ["two words", "--help", "="]:
+        args = ARGS[:4] + ["--host", host, "--port", "9999"]
+        for value in [parser.parse_args(args), parser.parse_earley(args)]:
+            assert value["config"]["db"] == {"host": host, "port": 9999}
+
+    value = parser.parse_args(ARGS[:4] + ["--host=a=b", "--port=9999"])
+    assert value["config"]["db"] == {"host": "a=b", "port": 9999}
+
+
+def test_missing_input_reported_from_single_parse():
+    """Input that ends early reports where it stopped and what could come next."""
+    parser = make_parser(clout._loaders.parsing.ParserCache())
+
+    with pytest.raises(clout.exceptions.MissingInput) as info:
+        parser.parse_args(ARGS[:5])
+
+    assert info.value.found == ARGS[:4]
+    assert {"--host", "--port", "--help"} <= set(info.value.expected)
+
+
+def test_parse_many_returns_results_in_order():
+    """Each command line gets a value or an error, in input order, and repeats are memoized."""
+    parser = make_parser(clout._loaders.parsing.ParserCache())
+    good = ARGS
+    missing = ARGS[:-1]
+    results = parser.parse_many([good, missing, good])
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[0].value == results[2].value
+    assert results[0].value is not results[2].value
+    assert results[1].error.type == "MissingInput"
+    assert len(parser._memo) == 2
+
+
+def test_parse_many_in_processes():
+    """Large batches parsed in worker processes give the same results."""
+    parser = make_parser(clout._loaders.parsing.ParserCache())
+    argvs = [ARGS[:-1] + [str(port)] for port in range(40)] + [ARGS[:-1]]
+
+    in_processes = parser.parse_many(argvs, processes=2, chunksize=8)
+    parser._memo.clear()
+
+    assert in_processes == parser.parse_many(argvs)
+    assert in_processes[5].value["config"]["db"]["port"] == 5
+    assert not in_processes[-1].ok
+
+
+def test_parse_many_returns_help(capsys):
+    """Help asked for in a batch is returned, not printed."""
+    parser = make_parser(clout._loaders.parsing.ParserCache())
+    [result] = parser.parse_many([ARGS[:2] + ["--help"]])
+
+    assert result.error.type == "HelpRequested"
+    assert "--dry-run" in result.error.message
+    assert capsys.readouterr().out == ""
+
+
+def test_concurrent_parse_many_keep_their_parsers():
+    """Batches parsed in processes at the same time each use their own parser."""
+    cache = clout._loaders.parsing.ParserCache()
+    parsers = [make_parser(cache, Config), make_parser(cache, NestedConfig)]
+    argvs = [ARGS[:-1] + [str(port)] for port in range(40)]
+    expected = [parser.parse_many(argvs) for parser in parsers]
+    for parser in parsers:
+        parser._memo.clear()
+
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        futures = [
+            executor.submit(parser.parse_many, argvs, processes=2, chunksize=8)
+            for parser in parsers
+        ]
+
+    assert [future.result() for future in futures] == expected
+    assert expected[0] != expected[1]
+
+
+def test_build_many():
+    """CLI.build_many builds objects and reports validation errors per item."""
+    cli = clout._loaders.cli.CLI(app_name="config")
+    argvs = [["--dry-run", "db", "--host", "a", "--port", "1"], ["db", "--port", "x"]]
+    results = cli.build_many(Config, argvs)
+
+    assert results[0].value == Config(DB("a", 1), True)
+    assert results[0].args == ("--dry-run", "db", "--host", "a", "--port", "1")
+    assert results[1].value is None
+    assert not results[1].ok
+
+
+def test_build_many_reuses_parses_across_batches(monkeypatch):
+    """Command lines parsed in one batch are not parsed again in the next."""
+    parsed = []
+    parse_one = clout._loaders.parsing.Parser.parse_one
+    monkeypatch.setattr(
+        clout._loaders.parsing.Parser,
+        "parse_one",
+        lambda self, args: parsed.append(args) or parse_one(self, args),
+    )
+    cli = clout._loaders.cli.CLI(app_name="config")
+    args = ["--dry-run", "db", "--host", "reused", "--port", "1"]
+
+    first = cli.build_many(Config, [args])
+    second = cli.build_many(Config, [args, args[:-1] + ["2"]])
+
+    assert first[0].value == second[0].value == Config(DB("reused", 1), True)
+    assert second[1].value == Config(DB("reused", 2), True)
+    assert [parsed_args[-1] for parsed_args in parsed] == ["1", "2"]
+
+
+def test_transformer_built_once_per_group(monkeypatch):
+    """Parses of one group share a transformer, and make one context per command."""
+    contexts = []
+
+    class Context(click.Context):
+        def __init__(self, command, *args, **kwargs):
+            contexts.append(command.name)
+            super().__init__(command, *args, **kwargs)
+
+    monkeypatch.setattr(click, "Context", Context)
+    cli = clout._loaders.cli.CLI(app_name="config")
+    command = cli.get_command(Config)
+    parse = lambda: clout._loaders.parsing.Parser(command).parse_args(ARGS)
+    transformer = clout._loaders.parsing.get_transformer(command, use_defaults=True)
+
+    assert parse() == parse()
+    assert clout._loaders.parsing.get_transformer(command, True) is transformer
+    assert sorted(contexts) == ["config", "config", "db", "db"]
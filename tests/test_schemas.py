@@ -0,0 +1,101 @@
+import gc
+import typing
+import weakref
+
+import attr
+import marshmallow
+import pytest
+
+import clout
+import clout._loaders.cli
+import clout._loaders.env
+import clout._loaders.schemas
+
+
+def test_schema_shared_until_cleared():
+    """Loaders share one schema per class until the cache is cleared for it."""
+
+    @attr.dataclass
+    class Config:
+        debug: bool
+
+    schema = clout._loaders.schemas.get_schema(Config)
+    assert clout._loaders.schemas.get_schema(Config) is schema
+    assert clout._loaders.schemas.get_schema(Config, {"ordered": True}) is not schema
+
+    clout.clear_schema_cache(Config)
+    assert clout._loaders.schemas.get_schema(Config) is not schema
+
+
+def test_clear_releases_dependent_caches():
+    """Clearing a class rebuilds its CLI, env index and loader, and frees it."""
+
+    def make_class():
+        @attr.dataclass
+        class Dynamic:
+            port: int
+
+        return Dynamic
+
+    cls = make_class()
+    cli = clout._loaders.cli.CLI(app_name="dynamic", args=["--port", "1"])
+    env = clout._loaders.env.Env(prefix="dyn")
+    command = cli.get_command(cls)
+    index = env.get_index(cls)
+    load = clout._loaders.schemas.get_loader(cls)
+    assert cli.build(cls) == cls(1)
+
+    clout.clear_schema_cache(cls)
+    schema = clout._loaders.schemas.get_schema(cls)
+    assert cli.get_command(cls) is not command
+    assert env.get_index(cls) is not index
+    assert env.get_index(cls).schema is schema
+    assert clout._loaders.schemas.get_loader(cls) is not load
+    assert cli.build(cls) == cls(1)
+
+    ref = weakref.ref(cls)
+    del cls, command, index, load, schema
+    clout.clear_schema_cache(ref())
+    gc.collect()
+    assert ref() is None
+
+
+@attr.dataclass
+class Limits:
+    retries: int
+    ratio: float = 0.5
+
+
+@attr.dataclass
+class Service:
+    name: str
+    limits: Limits
+    debug: bool = False
+    tags: typing.List[str] = attr.ib(factory=list)
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        {"name": "a", "limits": {"retries": 3}},
+        {"name": "a", "limits": {"retries": "3", "ratio": "1.5"}, "debug": "yes"},
+        {"name": "a", "limits": {"retries": 3}, "tags": ["x", "y"]},
+        {"name": 1, "limits": {"retries": "many", "ratio": float("nan")}},
+        {"name": None, "limits": {"other": 1}, "debug": "maybe", "extra": 1},
+        {"limits": "none"},
+        [],
+    ],
+)
+def test_loader_matches_schema(data):
+    """Generated loaders build the same objects and errors as ``schema.load``."""
+    schema = clout._loaders.schemas.get_schema(Service)
+    load = clout._loaders.schemas.get_loader(Service)
+
+    try:
+        expected = schema.load(data)
+    except marshmallow.ValidationError as e:
+        with pytest.raises(marshmallow.ValidationError) as info:
+            load(data)
+        assert info.value.messages == e.messages
+    else:
+        assert load(data) == expected
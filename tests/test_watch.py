@@ -0,0 +1,91 @@
+import json
+import os
+
+import attr
+import pytest
+
+import clout._loaders.file
+import clout._loaders.multi
+import clout._loaders.watch
+import clout.exceptions
+
+
+@attr.dataclass(frozen=True)
+class DB:
+    host: str
+    port: int = 5432
+
+
+@attr.dataclass(frozen=True)
+class Logging:
+    level: str = "INFO"
+
+
+@attr.dataclass(frozen=True)
+class Config:
+    db: DB
+    logging: Logging
+    debug: bool = False
+
+
+def write(path, data, mtime):
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_watcher_rebuilds_changed_subtrees(tmp_path):
+    """Only the changed subtree is rebuilt, and callbacks get the diff."""
+    path = tmp_path / "config.json"
+    write(path, {"db": {"host": "a"}, "logging": {"level": "INFO"}}, 1)
+    multi = clout._loaders.multi.Multi([clout._loaders.file.File(path)])
+    calls = []
+    watcher = clout._loaders.watch.Watcher(
+        multi, Config, callbacks=[lambda *a: calls.append(a)]
+    )
+    before = watcher.value
+    assert before == Config(DB("a"), Logging())
+
+    assert watcher.poll() == {}
+    write(path, {"db": {"host": "b"}, "logging": {"level": "INFO"}}, 2)
+    assert watcher.poll() == {("db", "host"): ("a", "b")}
+
+    assert watcher.value == Config(DB("b"), Logging())
+    assert watcher.value.logging is before.logging
+    assert calls == [(watcher.value, {("db", "host"): ("a", "b")})]
+
+
+def test_watcher_keeps_value_on_invalid_change(tmp_path):
+    """An invalid change raises, and the last good value is kept."""
+    path = tmp_path / "config.json"
+    write(path, {"db": {"host": "a", "port": 1}, "logging": {}}, 1)
+    multi = clout._loaders.multi.Multi([clout._loaders.file.File(path)])
+    watcher = clout._loaders.watch.Watcher(multi, Config)
+
+    write(path, {"db": {"host": "a", "port": "x"}, "logging": {}}, 2)
+    with pytest.raises(clout.exceptions.ValidationError):
+        watcher.poll()
+    assert watcher.value == Config(DB("a", 1), Logging())
+    # The failed change is tried again, not taken as the current data.
+    with pytest.raises(clout.exceptions.ValidationError):
+        watcher.poll()
+
+    write(path, {"db": {"host": "a", "port": 2}, "logging": {}}, 3)
+    assert watcher.poll() == {("db", "port"): (1, 2)}
+    assert watcher.value == Config(DB("a", 2), Logging())
+
+
+def test_watcher_passes_plain_values_in_raw_mode(tmp_path):
+    """Callbacks get the values of raw loaders, not their RawValue wrappers."""
+    path = tmp_path / "config.json"
+    write(path, {"db": {"host": "a"}, "logging": {}}, 1)
+    multi = clout._loaders.multi.Multi(
+        [clout._loaders.file.File(path)], data={"raw": True}
+    )
+    calls = []
+    watcher = clout._loaders.watch.Watcher(
+        multi, Config, callbacks=[lambda *a: calls.append(a)]
+    )
+
+    write(path, {"db": {"host": "b"}, "logging": {}}, 2)
+    assert watcher.poll() == {("db", "host"): ("a", "b")}
+    assert calls == [(Config(DB("b"), Logging()), {("db", "host"): ("a", "b")})]